@@ -4,212 +4,420 @@ Handles debug, logs, info, welcome, and test commands
 Updated to include request system information
 """
 
+import asyncio
 import logging
 import os
-from datetime import datetime
+import sys
+import time
+import weakref
+from collections import deque
+from itertools import islice
+from datetime import datetime, timedelta
+from io import BytesIO
 from telegram.ext import CallbackContext
 from telegram.constants import ParseMode
-from httpx import AsyncClient
 from wakeonlan import send_magic_packet
 
 from config import (
-    OFF_USER_IDS, MELBOURNE_TZ, GROUP_CHAT_ID, BOT_TOPIC_ID,
+    MELBOURNE_TZ, GROUP_CHAT_ID, BOT_TOPIC_ID,
     WEEKDAY_WAKE_HOUR, WEEKDAY_WAKE_MINUTE, WEEKEND_WAKE_HOUR, WEEKEND_WAKE_MINUTE,
     PLEX_MAC, PLEX_BROADCAST_IP, TAUTILLI_URL, SONARR_URL, RADARR_URL,
-    TMDB_BEARER_TOKEN
+    SONARR_API_KEY, RADARR_API_KEY, TMDB_BEARER_TOKEN, SILENT_NOTIFICATIONS
 )
-from utils.helpers import send_command_response, send_to_bot_topic, escape_md
-from utils.server_status import scheduled_wake
+from utils.helpers import send_command_response, send_to_bot_topic, escape_md, require_admin
+from utils import server_status
+from utils.http_client import get_http_client
+from commands.request_commands import request_manager
+from commands.media_commands import invalidate_series_cache
+from commands.moreeps_commands import invalidate_library_cache
+from utils.request_tracker import request_tracker
 
 logger = logging.getLogger(__name__)
 
+def _trunc_url(url: str, limit: int = 50) -> str:
+    """Shorten a URL for display, or note that it isn't configured"""
+    if not url:
+        return "Not configured"
+    return url[:limit] + '...' if len(url) > limit else url
+
+# Config values never change at runtime, so the static parts of the debug,
+# info and welcome messages are rendered once at import time.
+_PLEX_MAC_MD = escape_md(PLEX_MAC)
+_BROADCAST_IP_MD = escape_md(PLEX_BROADCAST_IP)
+_GROUP_CHAT_ID_MD = escape_md(str(GROUP_CHAT_ID))
+_BOT_TOPIC_ID_MD = escape_md(str(BOT_TOPIC_ID)) if BOT_TOPIC_ID else 'Not configured'
+_TAUTULLI_URL_MD, _SONARR_URL_MD, _RADARR_URL_MD = (
+    escape_md(_trunc_url(url)) for url in (TAUTILLI_URL, SONARR_URL, RADARR_URL)
+)
+
+_DEBUG_STATIC_MD = (
+    f"\\- Plex MAC: {_PLEX_MAC_MD}\n"
+    f"\\- Broadcast IP: {_BROADCAST_IP_MD}\n"
+    f"\\- Group Chat ID: {_GROUP_CHAT_ID_MD}\n"
+    f"\\- Bot Topic ID: {_BOT_TOPIC_ID_MD}\n"
+    f"\\- Weekday wake: {WEEKDAY_WAKE_HOUR:02d}:{WEEKDAY_WAKE_MINUTE:02d}\n"
+    f"\\- Weekend wake: {WEEKEND_WAKE_HOUR:02d}:{WEEKEND_WAKE_MINUTE:02d}\n"
+    f"\\- Tautulli URL: {_TAUTULLI_URL_MD}\n"
+    f"\\- Sonarr URL: {_SONARR_URL_MD}\n"
+    f"\\- Radarr URL: {_RADARR_URL_MD}\n"
+    # Request system status
+    f"\n🎬 *Request System Status*\n"
+    f"\\- TMDB API: {'✅ Configured' if TMDB_BEARER_TOKEN else '❌ Not configured'}\n"
+    f"\\- Movie requests: {'✅ Available' if (RADARR_URL and TMDB_BEARER_TOKEN) else '❌ Unavailable'}\n"
+    f"\\- TV requests: {'✅ Available' if (SONARR_URL and TMDB_BEARER_TOKEN) else '❌ Unavailable'}\n"
+)
+
+_INFO_MD = (
+    "🤖 *Plex Bot Information*\n\n"
+    "*Request Commands:*\n"
+    "\\- `/movie <title>` \\- Search for movies to request\n"
+    "\\- `/series <title>` or `/tv <title>` \\- Search for TV series\n"
+    "\\- `/moreeps <title>` \\- Add more episodes/seasons to existing shows\n"
+    "\\- `/myrequests` or `/requests` \\- View your request history\n\n"
+    "*Server Commands:*\n"
+    "\\- `/on` \\- Wake server \\(checks if already online\\)\n"
+    "\\- `/off` \\- Shutdown server \\(authorized users\\)\n"
+    "\\- `/status` \\- Check server status\n"
+    "\\- `/remotecheck` \\- Check if outside users can connect\n\n"
+    "*Media Commands:*\n"
+    "\\- `/nowplaying` or `/np` \\- Current streams\n"
+    "\\- `/stats` \\- Weekly viewing statistics\n"
+    "\\- `/hot` \\- Trending content\n"
+    "\\- `/upcoming` or `/up` \\- Upcoming releases\n"
+    "\\- `/queue` \\- View download queue status\n"
+    "\\- `/search <title>` \\- Search Plex library\n\n"
+    "*Admin Commands:*\n"
+    "\\- `/debug` \\- Bot status info\n"
+    "\\- `/testrequest` \\- Test request system APIs\n"
+    "\\- `/testwake` \\- Test Wake\\-on\\-LAN\n"
+    "\\- `/logs` \\- Recent log entries\n"
+    "\\- `/listrequests` \\- View all tracked requests\n"
+    "\\- `/clearrequest <id>` \\- Remove a specific request\n"
+    "\\- `/clearrequests` \\- Clear all completed requests\n"
+    "\\- `/refreshcache` \\- Drop cached Sonarr/Radarr lookups\n"
+    "\\- `/info` \\- This help message\n\n"
+    "*Request System Features:*\n"
+    "\\- No authentication required for group members\n"
+    "\\- TMDB search with interactive navigation\n"
+    "\\- Automatic Radarr/Sonarr integration\n"
+    "\\- Checks Plex library before adding duplicates\n"
+    "\\- Season selection \\(All, Latest, or Season 1\\)\n"
+    "\\- Add more episodes/seasons to existing shows\n"
+    "\\- Support for multiple root folders/quality profiles\n"
+    "\\- Request tracking with automatic notifications\n"
+    "\\- Status updates every 15 minutes\n\n"
+    "*Automated Features:*\n"
+    f"\\- Auto\\-wake weekdays: {WEEKDAY_WAKE_HOUR:02d}:{WEEKDAY_WAKE_MINUTE:02d}\n"
+    f"\\- Auto\\-wake weekends: {WEEKEND_WAKE_HOUR:02d}:{WEEKEND_WAKE_MINUTE:02d}\n"
+    "\\- Smart server detection \\(skips wake if already online\\)\n"
+    "\\- 30\\-minute grace period for missed schedules\n"
+    "\\- New content notifications \\(checks every 5 mins\\)\n"
+    "\\- Smart duplicate detection \\(no double notifications\\)"
+)
+
+_WELCOME_MD_HEADER = "👋 *Welcome to Plex Bot\\!*\n\n"
+_WELCOME_MD_BODY = (
+    "This bot manages your Plex server with automated wake\\-up, "
+    "media tracking, convenient remote control, and an integrated request system\\.\n\n"
+    "*Quick Start:*\n"
+    "\\- `/status` \\- Check if server is online\n"
+    "\\- `/on` \\- Wake server if needed\n"
+    "\\- `/np` \\- See what's currently playing\n"
+    "\\- `/movie <title>` \\- Request a movie\n"
+    "\\- `/series <title>` \\- Request a TV series\n"
+    "\\- `/info` \\- View all available commands\n\n"
+    "*Request System:*\n"
+    "Search and request movies/TV shows directly from TMDB\\. "
+    "Content is automatically added to Radarr/Sonarr for download\\. "
+    "No authentication required \\- works for all group members\\!\n\n"
+    "The server will automatically wake at scheduled times "
+    "\\(weekdays 4:30 PM, weekends 10:00 AM\\)\\.\n\n"
+    "Use `/debug` to check bot configuration and status\\."
+)
+
+DEBUG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S %Z'
+
+# Per-format cache of the escaped current time, refreshed once per second
+_time_cache = {}
+
+def _now_md(fmt: str) -> str:
+    """Return the current Melbourne time formatted with fmt and MarkdownV2-escaped"""
+    second = int(time.time())
+    cached = _time_cache.get(fmt)
+    if cached is None or cached[0] != second:
+        cached = (second, escape_md(datetime.now(MELBOURNE_TZ).strftime(fmt)))
+        _time_cache[fmt] = cached
+    return cached[1]
+
+# Cached scheduler detection output, refreshed at most every SCHEDULER_CACHE_TTL seconds
+SCHEDULER_CACHE_TTL = 30
+_scheduler_cache = {"ts": 0.0, "text": ""}
+# Fully rendered /debug message, reused for DEBUG_CACHE_TTL seconds
+DEBUG_CACHE_TTL = 5
+_debug_cache = {"ts": 0.0, "msg": None}
+
+# Weak reference to main.scheduler once found, so /debug doesn't keep walking sys.modules
+_scheduler_ref = None
+
+def _find_scheduler():
+    """Return main.scheduler (cached via weakref), or None if it doesn't exist"""
+    global _scheduler_ref
+    scheduler = _scheduler_ref() if _scheduler_ref is not None else None
+    if scheduler is None:
+        scheduler = getattr(sys.modules.get('main'), 'scheduler', None)
+        if scheduler is not None:
+            _scheduler_ref = weakref.ref(scheduler)
+    return scheduler
+
+def _detect_scheduler(app) -> str:
+    """Build the MarkdownV2 scheduler status lines for /debug"""
+    parts = []
+    try:
+        # Try to access the application's job queue to detect scheduler
+        # This is a more reliable way to check if scheduler is running
+        scheduler_found = False
+
+        # Check if the application has any running jobs (indicates scheduler is active)
+        if getattr(app, 'job_queue', None):
+            parts.append(f"\\- Job queue: Active\n")
+            scheduler_found = True
+
+        # Alternative method: check if we can find scheduler in the main module
+        scheduler = _find_scheduler()
+        if scheduler is not None:
+            if scheduler.running:
+                jobs = [(job.id, job.next_run_time) for job in scheduler.get_jobs()]
+                parts.append(f"\\- Active jobs: {len(jobs)}\n")
+
+                for job_id, next_run_time in jobs:
+                    if next_run_time:
+                        next_run = next_run_time.astimezone(MELBOURNE_TZ).strftime(DEBUG_TIME_FORMAT)
+                        parts.append(f"\\- {escape_md(job_id)}: {escape_md(next_run)}\n")
+                        parts.append(f"  \\(30min grace period\\)\n")
+                    else:
+                        parts.append(f"\\- {escape_md(job_id)}: Never\n")
+                scheduler_found = True
+            else:
+                parts.append(f"\\- Scheduler created but not running\n")
+        elif 'main' in sys.modules:
+            parts.append(f"\\- Scheduler object not found in main module\n")
+
+        # If we couldn't detect the scheduler through normal means,
+        # fall back to the in-process auto-wake heartbeat as evidence
+        if not scheduler_found:
+            last_wake = server_status.last_auto_wake
+            if last_wake and datetime.now(MELBOURNE_TZ) - last_wake < timedelta(hours=24):
+                parts.append(f"\\- Recent auto\\-wake activity detected\n")
+                parts.append(f"\\- Scheduler appears to be working \\(indirect detection\\)\n")
+            else:
+                parts.append(f"\\- No recent scheduler activity detected\n")
+                parts.append(f"\\- Scheduler status uncertain\n")
+
+    except Exception as e:
+        parts.append(f"\\- Scheduler detection failed: {escape_md(str(e))}\n")
+        parts.append(f"\\- Note: Scheduler may be working despite detection issues\n")
+
+    return "".join(parts)
+
 async def debug_command(update, context: CallbackContext):
     """Debug command to check bot status and scheduler"""
     try:
-        current_time = datetime.now(MELBOURNE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
-        msg = f"🔍 *Bot Debug Info*\n"
-        msg += f"\\- Current time: {escape_md(current_time)}\n"
-        msg += f"\\- Plex MAC: {escape_md(PLEX_MAC)}\n"
-        msg += f"\\- Broadcast IP: {escape_md(PLEX_BROADCAST_IP)}\n"
-        msg += f"\\- Group Chat ID: {escape_md(str(GROUP_CHAT_ID))}\n"
-        msg += f"\\- Bot Topic ID: {escape_md(str(BOT_TOPIC_ID)) if BOT_TOPIC_ID else 'Not configured'}\n"
-        msg += f"\\- Weekday wake: {WEEKDAY_WAKE_HOUR:02d}:{WEEKDAY_WAKE_MINUTE:02d}\n"
-        msg += f"\\- Weekend wake: {WEEKEND_WAKE_HOUR:02d}:{WEEKEND_WAKE_MINUTE:02d}\n"
-        msg += f"\\- Tautulli URL: {escape_md(TAUTILLI_URL[:50] + '...' if len(TAUTILLI_URL) > 50 else TAUTILLI_URL)}\n"
-        msg += f"\\- Sonarr URL: {escape_md(SONARR_URL[:50] + '...' if len(SONARR_URL) > 50 else SONARR_URL) if SONARR_URL else 'Not configured'}\n"
-        msg += f"\\- Radarr URL: {escape_md(RADARR_URL[:50] + '...' if len(RADARR_URL) > 50 else RADARR_URL) if RADARR_URL else 'Not configured'}\n"
-        
-        # Request system status
-        msg += f"\n🎬 *Request System Status*\n"
-        msg += f"\\- TMDB API: {'✅ Configured' if TMDB_BEARER_TOKEN else '❌ Not configured'}\n"
-        msg += f"\\- Movie requests: {'✅ Available' if (RADARR_URL and TMDB_BEARER_TOKEN) else '❌ Unavailable'}\n"
-        msg += f"\\- TV requests: {'✅ Available' if (SONARR_URL and TMDB_BEARER_TOKEN) else '❌ Unavailable'}\n"
-        
-        # Enhanced scheduler detection - check if the application has a scheduler
-        msg += f"\n📅 *Scheduler Status*\n"
-        
-        try:
-            # Try to access the application's job queue to detect scheduler
-            # This is a more reliable way to check if scheduler is running
-            scheduler_found = False
-            app = context.application
-            
-            # Check if the application has any running jobs (indicates scheduler is active)
-            if hasattr(app, 'job_queue') and app.job_queue:
-                msg += f"\\- Job queue: Active\n"
-                scheduler_found = True
-            
-            # Alternative method: check if we can find scheduler in sys.modules
-            import sys
-            if 'main' in sys.modules:
-                main_module = sys.modules['main']
-                if hasattr(main_module, 'scheduler') and main_module.scheduler:
-                    scheduler = main_module.scheduler
-                    if scheduler.running:
-                        jobs = scheduler.get_jobs()
-                        msg += f"\\- Active jobs: {len(jobs)}\n"
-                        
-                        for job in jobs:
-                            if job.next_run_time:
-                                next_run = job.next_run_time.astimezone(MELBOURNE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
-                                msg += f"\\- {escape_md(job.id)}: {escape_md(next_run)}\n"
-                                msg += f"  \\(30min grace period\\)\n"
-                            else:
-                                msg += f"\\- {escape_md(job.id)}: Never\n"
-                        scheduler_found = True
-                    else:
-                        msg += f"\\- Scheduler created but not running\n"
-                else:
-                    msg += f"\\- Scheduler object not found in main module\n"
-            
-            # If we couldn't detect the scheduler through normal means, 
-            # check for recent auto-wake activity in logs as evidence
-            if not scheduler_found:
-                try:
-                    # Check if we can find recent scheduler activity in logs
-                    # This is indirect but indicates the scheduler was working recently
-                    import subprocess
-                    result = subprocess.run(
-                        ['journalctl', '-u', 'plexbot', '--since', '24 hours ago', '--grep', 'Auto-wake job triggered'],
-                        capture_output=True, text=True, timeout=5
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        msg += f"\\- Recent auto\\-wake activity detected in logs\n"
-                        msg += f"\\- Scheduler appears to be working \\(indirect detection\\)\n"
-                    else:
-                        msg += f"\\- No recent scheduler activity detected\n"
-                        msg += f"\\- Scheduler status uncertain\n"
-                except Exception:
-                    msg += f"\\- Scheduler status: Unable to detect\n"
-                    msg += f"\\- \\(Import/detection limitations\\)\n"
-            
-        except Exception as e:
-            msg += f"\\- Scheduler detection failed: {escape_md(str(e))}\n"
-            msg += f"\\- Note: Scheduler may be working despite detection issues\n"
-            
+        # Absorb bursts of /debug (e.g. health-check polling) with the last rendered message
+        now = time.monotonic()
+        if _debug_cache["msg"] and now - _debug_cache["ts"] < DEBUG_CACHE_TTL:
+            await send_command_response(update, context, _debug_cache["msg"], parse_mode=ParseMode.MARKDOWN_V2)
+            return
+
+        # Scheduler detection is cached briefly so repeated /debug calls don't re-probe
+        if not _scheduler_cache["text"] or now - _scheduler_cache["ts"] > SCHEDULER_CACHE_TTL:
+            _scheduler_cache["text"] = _detect_scheduler(context.application)
+            _scheduler_cache["ts"] = now
+
+        msg = "".join((
+            f"🔍 *Bot Debug Info*\n\\- Current time: {_now_md(DEBUG_TIME_FORMAT)}\n",
+            _DEBUG_STATIC_MD,
+            "\n📅 *Scheduler Status*\n",
+            _scheduler_cache["text"],
+        ))
+        _debug_cache["msg"] = msg
+        _debug_cache["ts"] = now
+
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
     except Exception as e:
         logger.error("❌ Debug command failed: %s", e)
         await send_command_response(update, context, f"❌ Debug failed: {e}")
 
+# Last /testrequest result, reused for TESTREQUEST_CACHE_TTL seconds
+TESTREQUEST_CACHE_TTL = 20
+# Upper bound on each /testrequest probe, in seconds
+PROBE_TIMEOUT = 6.0
+# TMDB gets a tighter per-request timeout since it only fetches /configuration
+TMDB_PROBE_TIMEOUT = 2.0
+_testrequest_cache = {"ts": 0.0, "msg": None}
+
+_NOTHING_CONFIGURED_MD = (
+    "🧪 *Request System API Test Results*\n\n"
+    "❌ TMDB, Radarr and Sonarr are all unconfigured\\. Check all configurations\\."
+)
+
+async def _probe_tmdb() -> str:
+    """Check the TMDB API and return a one-line result"""
+    if not TMDB_BEARER_TOKEN:
+        return "❌ TMDB API: Not configured"
+    headers = {"Authorization": f"Bearer {TMDB_BEARER_TOKEN}", "accept": "application/json"}
+    # /configuration is a tiny payload - enough to prove reachability and auth
+    resp = await get_http_client().get("https://api.themoviedb.org/3/configuration", headers=headers, timeout=TMDB_PROBE_TIMEOUT)
+    if resp.status_code == 200:
+        return "✅ TMDB API: Working"
+    return f"❌ TMDB API: Failed ({resp.status_code})"
+
+async def _arr_status(base_url: str, api_key: str):
+    """Check a Sonarr/Radarr server via the small /system/status endpoint, returning an error or None"""
+    client = get_http_client()
+    headers = {"X-Api-Key": api_key}
+    for api_version in ["v3", "v2", "v1"]:
+        try:
+            resp = await client.get(f"{base_url.rstrip('/')}/api/{api_version}/system/status", headers=headers)
+        except Exception:
+            continue
+        if resp.status_code == 200:
+            return None
+        if resp.status_code != 404:
+            return f"Failed ({resp.status_code})"
+    return "Server is offline. Please use /on to wake it up, then try again."
+
+async def _probe_arr(name: str, base_url: str, api_key: str, get_root_folders) -> str:
+    """Check Sonarr/Radarr reachability live while reading root folders from the request cache"""
+    if not base_url:
+        return f"❌ {name} API: Not configured"
+    status_error, (folders, error) = await asyncio.gather(_arr_status(base_url, api_key), get_root_folders())
+    error = status_error or error
+    if error:
+        return f"❌ {name} API: {error}"
+    return f"✅ {name} API: {len(folders)} root folders"
+
+async def _probe_radarr() -> str:
+    """Check the Radarr API and return a one-line result"""
+    return await _probe_arr("Radarr", RADARR_URL, RADARR_API_KEY, request_manager.get_radarr_root_folders)
+
+async def _probe_sonarr() -> str:
+    """Check the Sonarr API and return a one-line result"""
+    return await _probe_arr("Sonarr", SONARR_URL, SONARR_API_KEY, request_manager.get_sonarr_root_folders)
+
 async def testrequest_command(update, context: CallbackContext):
     """Test request system APIs (TMDB, Sonarr, Radarr)"""
     try:
-        await send_command_response(update, context, "🔍 Testing request system APIs\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        if not (TMDB_BEARER_TOKEN or RADARR_URL or SONARR_URL):
+            await send_command_response(update, context, _NOTHING_CONFIGURED_MD, parse_mode=ParseMode.MARKDOWN_V2)
+            return
+
+        # Serve the last result during bursts; "/testrequest force" bypasses the cache
+        force = bool(context.args) and context.args[0].lower() == "force"
+        if not force and _testrequest_cache["msg"] and time.monotonic() - _testrequest_cache["ts"] < TESTREQUEST_CACHE_TTL:
+            await send_command_response(update, context, _testrequest_cache["msg"], parse_mode=ParseMode.MARKDOWN_V2)
+            return
+
+        # Send the progress note while the probes run rather than before them
+        progress = asyncio.create_task(
+            send_command_response(update, context, "🔍 Testing request system APIs\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        )
         
+        # Probes are independent network round-trips, so run them concurrently
+        names = ("TMDB API", "Radarr API", "Sonarr API")
+        # Each probe is capped so a single hung upstream can't stall the reply
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(probe, PROBE_TIMEOUT) for probe in (_probe_tmdb(), _probe_radarr(), _probe_sonarr())),
+            return_exceptions=True
+        )
         results = []
-        
-        # Test TMDB API
-        if TMDB_BEARER_TOKEN:
-            try:
-                headers = {"Authorization": f"Bearer {TMDB_BEARER_TOKEN}", "accept": "application/json"}
-                async with AsyncClient() as client:
-                    resp = await client.get("https://api.themoviedb.org/3/trending/movie/week", headers=headers)
-                    if resp.status_code == 200:
-                        results.append("✅ TMDB API: Working")
-                    else:
-                        results.append(f"❌ TMDB API: Failed ({resp.status_code})")
-            except Exception as e:
-                results.append(f"❌ TMDB API: Error ({str(e)[:30]}...)")
-        else:
-            results.append("❌ TMDB API: Not configured")
-        
-        # Test Radarr API
-        if RADARR_URL:
-            try:
-                from commands.request_commands import request_manager
-                folders, error = await request_manager.get_radarr_root_folders()
-                if error:
-                    results.append(f"❌ Radarr API: {error}")
-                else:
-                    results.append(f"✅ Radarr API: {len(folders)} root folders")
-            except Exception as e:
-                results.append(f"❌ Radarr API: Error ({str(e)[:30]}...)")
-        else:
-            results.append("❌ Radarr API: Not configured")
-        
-        # Test Sonarr API
-        if SONARR_URL:
-            try:
-                from commands.request_commands import request_manager
-                folders, error = await request_manager.get_sonarr_root_folders()
-                if error:
-                    results.append(f"❌ Sonarr API: {error}")
-                else:
-                    results.append(f"✅ Sonarr API: {len(folders)} root folders")
-            except Exception as e:
-                results.append(f"❌ Sonarr API: Error ({str(e)[:30]}...)")
-        else:
-            results.append("❌ Sonarr API: Not configured")
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                results.append(f"❌ {name}: Timed out after {PROBE_TIMEOUT:.0f}s")
+            elif isinstance(outcome, Exception):
+                results.append(f"❌ {name}: Error ({str(outcome)[:30]}...)")
+            else:
+                results.append(outcome)
         
         # Format results
-        msg = "🧪 *Request System API Test Results*\n\n"
-        for result in results:
-            msg += f"{escape_md(result)}\n"
+        parts = ["🧪 *Request System API Test Results*\n\n"]
+        parts.extend(f"{escape_md(result)}\n" for result in results)
         
         # Add recommendations
-        working_apis = len([r for r in results if r.startswith("✅")])
+        working_apis = sum(1 for r in results if r.startswith("✅"))
         if working_apis == 3:
-            msg += f"\n🎉 All APIs working\\! Request system fully functional\\."
+            parts.append(f"\n🎉 All APIs working\\! Request system fully functional\\.")
         elif working_apis >= 1:
-            msg += f"\n⚠️ {working_apis}/3 APIs working\\. Check configuration for failed APIs\\."
+            parts.append(f"\n⚠️ {working_apis}/3 APIs working\\. Check configuration for failed APIs\\.")
         else:
-            msg += f"\n❌ No APIs working\\. Check all configurations\\."
+            parts.append(f"\n❌ No APIs working\\. Check all configurations\\.")
+        msg = "".join(parts)
+        _testrequest_cache.update(ts=time.monotonic(), msg=msg)
         
+        # Replace the progress note with the results rather than sending a second message
+        status_msg = await progress
+        if status_msg is not None:
+            try:
+                await status_msg.edit_text(msg, parse_mode=ParseMode.MARKDOWN_V2)
+                return
+            except Exception as e:
+                logger.warning("⚠️ Could not edit test progress message, sending new one: %s", e)
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
         
     except Exception as e:
         logger.error("❌ Request system test failed: %s", e)
         await send_command_response(update, context, f"❌ Test failed: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
+# Log tails longer than this (in characters) are sent as a document instead of a code block
+LOG_UPLOAD_THRESHOLD = 3000
+
+def _tail(path: str, n: int = 20, block: int = 8192) -> list:
+    """Return the last n lines of a file by reading backwards from the end"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = deque()
+        newlines = 0
+        # One extra newline is needed because the file normally ends with one
+        while pos > 0 and newlines <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.appendleft(chunk)
+            newlines += chunk.count(b'\n')
+    lines = b''.join(chunks).decode('utf-8', errors='replace').splitlines()
+    return lines[-n:]
+
+@require_admin
 async def logs_command(update, context: CallbackContext):
     """Show recent log entries from current session"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:  # Only authorized users
-        return await send_command_response(update, context, "❌ Not authorized.")
-    
     try:
-        # Read the entire current session log file
+        # Read only the tail of the current session log file
         log_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'bot.log')
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Get last 20 lines
-        recent_lines = lines[-20:] if len(lines) > 20 else lines
+        recent_lines = await asyncio.to_thread(_tail, log_file, 20)
         
         if not recent_lines:
             await send_command_response(update, context, "📝 No log entries found\\.", parse_mode=ParseMode.MARKDOWN_V2)
             return
         
-        # Format log entries
-        log_text = "📝 *Recent Log Entries \\(Last 20\\)*\n\n```\n"
-        for line in recent_lines:
-            # Remove newlines and limit line length
-            clean_line = line.strip()
-            if len(clean_line) > 80:
-                clean_line = clean_line[:77] + "..."
-            log_text += clean_line + "\n"
-        log_text += "```"
+        # Large tails are uploaded as a file so nothing gets truncated
+        tail_text = "\n".join(recent_lines)
+        if len(tail_text) > LOG_UPLOAD_THRESHOLD:
+            await context.bot.send_document(
+                chat_id=GROUP_CHAT_ID,
+                document=BytesIO(tail_text.encode('utf-8')),
+                filename='bot.log.tail',
+                caption="📝 Recent log entries (last 20)",
+                message_thread_id=BOT_TOPIC_ID,
+                disable_notification=SILENT_NOTIFICATIONS
+            )
+            return
+
+        # Format log entries, limiting line length
+        trimmed = [
+            line if len(line) <= 80 else line[:77] + "..."
+            for line in (raw.strip() for raw in recent_lines)
+        ]
+        log_text = "📝 *Recent Log Entries \\(Last 20\\)*\n\n```\n" + "\n".join(trimmed) + "\n```"
         
         await send_command_response(update, context, log_text, parse_mode=ParseMode.MARKDOWN_V2)
         
@@ -219,24 +427,26 @@ async def logs_command(update, context: CallbackContext):
         logger.error("❌ Logs command failed: %s", e)
         await send_command_response(update, context, f"❌ Failed to read logs: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
+@require_admin
 async def testwake_command(update, context: CallbackContext):
     """Test wake-on-LAN functionality"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:  # Only authorized users
-        return await send_command_response(update, context, "❌ Not authorized.")
-    
     try:
-        await send_command_response(update, context, "🔍 Testing Wake\\-on\\-LAN\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        progress = asyncio.create_task(
+            send_command_response(update, context, "🔍 Testing Wake\\-on\\-LAN\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        )
         
-        # Send WOL packet
-        send_magic_packet(PLEX_MAC, ip_address=PLEX_BROADCAST_IP)
+        # Send WOL packet off the event loop
+        await asyncio.to_thread(send_magic_packet, PLEX_MAC, ip_address=PLEX_BROADCAST_IP)
         logger.info("✅ Test WOL packet sent to %s via %s", PLEX_MAC, PLEX_BROADCAST_IP)
         
-        msg = "✅ *Wake\\-on\\-LAN Test*\n\n"
-        msg += f"Packet sent to: {escape_md(PLEX_MAC)}\n"
-        msg += f"Via broadcast: {escape_md(PLEX_BROADCAST_IP)}\n"
-        msg += "Check server status in a few moments\\."
+        msg = "".join((
+            "✅ *Wake\\-on\\-LAN Test*\n\n",
+            f"Packet sent to: {_PLEX_MAC_MD}\n",
+            f"Via broadcast: {_BROADCAST_IP_MD}\n",
+            "Check server status in a few moments\\.",
+        ))
         
+        await progress
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
         
     except Exception as e:
@@ -246,57 +456,8 @@ async def testwake_command(update, context: CallbackContext):
 async def info_command(update, context: CallbackContext):
     """Show bot information and available commands"""
     try:
-        msg = "🤖 *Plex Bot Information*\n\n"
-        
-        msg += "*Request Commands:*\n"
-        msg += "\\- `/movie <title>` \\- Search for movies to request\n"
-        msg += "\\- `/series <title>` or `/tv <title>` \\- Search for TV series\n"
-        msg += "\\- `/moreeps <title>` \\- Add more episodes/seasons to existing shows\n"
-        msg += "\\- `/myrequests` or `/requests` \\- View your request history\n\n"
-        
-        msg += "*Server Commands:*\n"
-        msg += "\\- `/on` \\- Wake server \\(checks if already online\\)\n"
-        msg += "\\- `/off` \\- Shutdown server \\(authorized users\\)\n"
-        msg += "\\- `/status` \\- Check server status\n"
-        msg += "\\- `/remotecheck` \\- Check if outside users can connect\n\n"
-        
-        msg += "*Media Commands:*\n"
-        msg += "\\- `/nowplaying` or `/np` \\- Current streams\n"
-        msg += "\\- `/stats` \\- Weekly viewing statistics\n"
-        msg += "\\- `/hot` \\- Trending content\n"
-        msg += "\\- `/upcoming` or `/up` \\- Upcoming releases\n"
-        msg += "\\- `/queue` \\- View download queue status\n"
-        msg += "\\- `/search <title>` \\- Search Plex library\n\n"
-        
-        msg += "*Admin Commands:*\n"
-        msg += "\\- `/debug` \\- Bot status info\n"
-        msg += "\\- `/testrequest` \\- Test request system APIs\n"
-        msg += "\\- `/testwake` \\- Test Wake\\-on\\-LAN\n"
-        msg += "\\- `/logs` \\- Recent log entries\n"
-        msg += "\\- `/listrequests` \\- View all tracked requests\n"
-        msg += "\\- `/clearrequest <id>` \\- Remove a specific request\n"
-        msg += "\\- `/clearrequests` \\- Clear all completed requests\n"
-        msg += "\\- `/info` \\- This help message\n\n"
-        
-        msg += "*Request System Features:*\n"
-        msg += "\\- No authentication required for group members\n"
-        msg += "\\- TMDB search with interactive navigation\n"
-        msg += "\\- Automatic Radarr/Sonarr integration\n"
-        msg += "\\- Checks Plex library before adding duplicates\n"
-        msg += "\\- Season selection \\(All, Latest, or Season 1\\)\n"
-        msg += "\\- Add more episodes/seasons to existing shows\n"
-        msg += "\\- Support for multiple root folders/quality profiles\n"
-        msg += "\\- Request tracking with automatic notifications\n"
-        msg += "\\- Status updates every 15 minutes\n\n"
-        
-        msg += "*Automated Features:*\n"
-        msg += f"\\- Auto\\-wake weekdays: {WEEKDAY_WAKE_HOUR:02d}:{WEEKDAY_WAKE_MINUTE:02d}\n"
-        msg += f"\\- Auto\\-wake weekends: {WEEKEND_WAKE_HOUR:02d}:{WEEKEND_WAKE_MINUTE:02d}\n"
-        msg += "\\- Smart server detection \\(skips wake if already online\\)\n"
-        msg += "\\- 30\\-minute grace period for missed schedules\n"
-        msg += "\\- New content notifications \\(checks every 5 mins\\)\n"
-        msg += "\\- Smart duplicate detection \\(no double notifications\\)"
-        
+        msg = _INFO_MD
+
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
         
     except Exception as e:
@@ -306,27 +467,8 @@ async def info_command(update, context: CallbackContext):
 async def welcome_command(update, context: CallbackContext):
     """Welcome message with bot overview"""
     try:
-        current_time = datetime.now(MELBOURNE_TZ).strftime('%H:%M %Z')
-        
-        msg = "👋 *Welcome to Plex Bot\\!*\n\n"
-        msg += f"🕐 Current time: {escape_md(current_time)}\n\n"
-        msg += "This bot manages your Plex server with automated wake\\-up, "
-        msg += "media tracking, convenient remote control, and an integrated request system\\.\n\n"
-        msg += "*Quick Start:*\n"
-        msg += "\\- `/status` \\- Check if server is online\n"
-        msg += "\\- `/on` \\- Wake server if needed\n"
-        msg += "\\- `/np` \\- See what's currently playing\n"
-        msg += "\\- `/movie <title>` \\- Request a movie\n"
-        msg += "\\- `/series <title>` \\- Request a TV series\n"
-        msg += "\\- `/info` \\- View all available commands\n\n"
-        msg += "*Request System:*\n"
-        msg += "Search and request movies/TV shows directly from TMDB\\. "
-        msg += "Content is automatically added to Radarr/Sonarr for download\\. "
-        msg += "No authentication required \\- works for all group members\\!\n\n"
-        msg += "The server will automatically wake at scheduled times "
-        msg += "\\(weekdays 4:30 PM, weekends 10:00 AM\\)\\.\n\n"
-        msg += "Use `/debug` to check bot configuration and status\\."
-        
+        msg = f"{_WELCOME_MD_HEADER}🕐 Current time: {_now_md('%H:%M %Z')}\n\n{_WELCOME_MD_BODY}"
+
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
 
     except Exception as e:
@@ -334,70 +476,80 @@ async def welcome_command(update, context: CallbackContext):
         await send_command_response(update, context, f"❌ Failed to show welcome: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
 
+# Row emoji per media type in /requests
+_MEDIA_EMOJI = {"movie": "🎬", "tv": "📺"}
+
+
+def _pending_row(req) -> str:
+    """Render a pending request for /requests"""
+    media_emoji = _MEDIA_EMOJI.get(req["media_type"], "📺")
+    title = escape_md(req.get("title", "Unknown"))
+    user = escape_md(req.get("username", "Unknown"))
+    status = escape_md(req.get("status", "pending"))
+    req_id = escape_md(req.get("id", "")[:20])
+    return f"{media_emoji} {title} \\- @{user}\n   Status: {status} \\| ID: `{req_id}`\n"
+
+
+def _unreleased_row(req) -> str:
+    """Render an unreleased request for /requests"""
+    media_emoji = _MEDIA_EMOJI.get(req["media_type"], "📺")
+    title = escape_md(req.get("title", "Unknown"))
+    release = escape_md(req.get("release_date", "Unknown"))
+    req_id = escape_md(req.get("id", "")[:20])
+    return f"{media_emoji} {title} \\- {release}\n   ID: `{req_id}`\n"
+
+
+def _completed_row(req) -> str:
+    """Render a completed request for /requests"""
+    media_emoji = _MEDIA_EMOJI.get(req["media_type"], "📺")
+    title = escape_md(req.get("title", "Unknown"))
+    req_id = escape_md(req.get("id", "")[:20])
+    return f"{media_emoji} {title}\n   ID: `{req_id}`\n"
+
+
+@require_admin
 async def requests_admin_command(update, context: CallbackContext):
     """List all tracked requests (admin command)"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:
-        return await send_command_response(update, context, "❌ Not authorized.")
-
     try:
-        from utils.request_tracker import request_tracker
-
         all_requests = request_tracker.requests.get("requests", [])
 
         if not all_requests:
             await send_command_response(update, context, "📭 No requests in the database\\.", parse_mode=ParseMode.MARKDOWN_V2)
             return
 
-        # Group by status
-        pending = [r for r in all_requests if not r.get("notified", False) and r.get("status") != "unreleased"]
-        unreleased = [r for r in all_requests if r.get("status") == "unreleased"]
-        completed = [r for r in all_requests if r.get("notified", False)]
-
-        msg = "📋 *All Tracked Requests*\n\n"
-
-        if pending:
-            msg += f"*🔄 Pending \\({len(pending)}\\):*\n"
-            for req in pending[:10]:  # Limit to 10
-                media_emoji = "🎬" if req["media_type"] == "movie" else "📺"
-                title = escape_md(req.get("title", "Unknown"))
-                user = escape_md(req.get("username", "Unknown"))
-                status = escape_md(req.get("status", "pending"))
-                req_id = escape_md(req.get("id", "")[:20])
-                msg += f"{media_emoji} {title} \\- @{user}\n"
-                msg += f"   Status: {status} \\| ID: `{req_id}`\n"
-            if len(pending) > 10:
-                msg += f"   _\\.\\.\\. and {len(pending) - 10} more_\n"
-            msg += "\n"
-
-        if unreleased:
-            msg += f"*📅 Unreleased \\({len(unreleased)}\\):*\n"
-            for req in unreleased[:5]:
-                media_emoji = "🎬" if req["media_type"] == "movie" else "📺"
-                title = escape_md(req.get("title", "Unknown"))
-                release = req.get("release_date", "Unknown")
-                req_id = escape_md(req.get("id", "")[:20])
-                msg += f"{media_emoji} {title} \\- {escape_md(release)}\n"
-                msg += f"   ID: `{req_id}`\n"
-            if len(unreleased) > 5:
-                msg += f"   _\\.\\.\\. and {len(unreleased) - 5} more_\n"
-            msg += "\n"
-
-        if completed:
-            msg += f"*✅ Completed \\({len(completed)}\\):*\n"
-            for req in completed[:5]:
-                media_emoji = "🎬" if req["media_type"] == "movie" else "📺"
-                title = escape_md(req.get("title", "Unknown"))
-                req_id = escape_md(req.get("id", "")[:20])
-                msg += f"{media_emoji} {title}\n"
-                msg += f"   ID: `{req_id}`\n"
-            if len(completed) > 5:
-                msg += f"   _\\.\\.\\. and {len(completed) - 5} more_\n"
-            msg += "\n"
-
-        msg += f"*Total: {len(all_requests)} requests*\n\n"
-        msg += "_Use `/clearrequest <id>` to remove a specific request_\n"
-        msg += "_Use `/clearrequests` to remove all completed requests_"
+        # Count every bucket in one pass; only the displayed rows are materialized
+        counts = request_tracker.bucket_counts()
+
+        parts = ["📋 *All Tracked Requests*\n\n"]
+
+        pending_count = counts["pending"]
+        if pending_count:
+            parts.append(f"*🔄 Pending \\({pending_count}\\):*\n")
+            parts.extend(_pending_row(req) for req in islice(request_tracker.iter_bucket("pending"), 10))
+            if pending_count > 10:
+                parts.append(f"   _\\.\\.\\. and {pending_count - 10} more_\n")
+            parts.append("\n")
+
+        unreleased_count = counts["unreleased"]
+        if unreleased_count:
+            parts.append(f"*📅 Unreleased \\({unreleased_count}\\):*\n")
+            parts.extend(_unreleased_row(req) for req in islice(request_tracker.iter_bucket("unreleased"), 5))
+            if unreleased_count > 5:
+                parts.append(f"   _\\.\\.\\. and {unreleased_count - 5} more_\n")
+            parts.append("\n")
+
+        completed_count = counts["completed"]
+        if completed_count:
+            parts.append(f"*✅ Completed \\({completed_count}\\):*\n")
+            parts.extend(_completed_row(req) for req in islice(request_tracker.iter_bucket("completed"), 5))
+            if completed_count > 5:
+                parts.append(f"   _\\.\\.\\. and {completed_count - 5} more_\n")
+            parts.append("\n")
+
+        parts.append(f"*Total: {len(all_requests)} requests*\n\n")
+        parts.append("_Use `/clearrequest <id>` to remove a specific request_\n")
+        parts.append("_Use `/clearrequests` to remove all completed requests_")
+        msg = "".join(parts)
 
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
 
@@ -406,12 +558,9 @@ async def requests_admin_command(update, context: CallbackContext):
         await send_command_response(update, context, f"❌ Failed to list requests: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
 
+@require_admin
 async def clearrequest_command(update, context: CallbackContext):
     """Remove a specific request by ID"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:
-        return await send_command_response(update, context, "❌ Not authorized.")
-
     if not context.args:
         await send_command_response(
             update, context,
@@ -423,20 +572,10 @@ async def clearrequest_command(update, context: CallbackContext):
     request_id = context.args[0]
 
     try:
-        from utils.request_tracker import request_tracker
-
-        # Find and remove the request
-        original_count = len(request_tracker.requests["requests"])
-        request_tracker.requests["requests"] = [
-            r for r in request_tracker.requests["requests"]
-            if not r.get("id", "").startswith(request_id)
-        ]
-        new_count = len(request_tracker.requests["requests"])
-
-        removed = original_count - new_count
+        # Find and remove the request (exact IDs skip the prefix scan)
+        removed = request_tracker.remove_requests_by_prefix(request_id)
 
         if removed > 0:
-            request_tracker._save_requests()
             await send_command_response(
                 update, context,
                 f"✅ Removed {removed} request\\(s\\) matching `{escape_md(request_id)}`",
@@ -456,18 +595,12 @@ async def clearrequest_command(update, context: CallbackContext):
         await send_command_response(update, context, f"❌ Failed to remove request: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
 
+@require_admin
 async def clearrequests_command(update, context: CallbackContext):
     """Clear all completed/notified requests"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:
-        return await send_command_response(update, context, "❌ Not authorized.")
-
     try:
-        from utils.request_tracker import request_tracker
-
-        # Count completed requests
-        original_count = len(request_tracker.requests["requests"])
-        completed_count = len([r for r in request_tracker.requests["requests"] if r.get("notified", False)])
+        # Remove completed requests
+        completed_count = request_tracker.clear_completed()
 
         if completed_count == 0:
             await send_command_response(
@@ -477,13 +610,6 @@ async def clearrequests_command(update, context: CallbackContext):
             )
             return
 
-        # Remove completed requests
-        request_tracker.requests["requests"] = [
-            r for r in request_tracker.requests["requests"]
-            if not r.get("notified", False)
-        ]
-        request_tracker._save_requests()
-
         remaining = len(request_tracker.requests["requests"])
 
         await send_command_response(
@@ -500,6 +626,20 @@ async def clearrequests_command(update, context: CallbackContext):
         await send_command_response(update, context, f"❌ Failed to clear requests: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
 
+@require_admin
+async def refreshcache_command(update, context: CallbackContext):
+    """Drop cached Sonarr/Radarr lookups so the next commands refetch them"""
+    try:
+        invalidate_series_cache()
+        invalidate_library_cache()
+        request_manager.invalidate_folders_cache()
+        logger.info("🔄 Admin %s refreshed cached Sonarr/Radarr lookups", update.effective_user.username)
+        await send_command_response(update, context, "🔄 Cached Sonarr/Radarr lookups cleared\\.", parse_mode=ParseMode.MARKDOWN_V2)
+    except Exception as e:
+        logger.error("❌ Refresh cache command failed: %s", e)
+        await send_command_response(update, context, f"❌ Failed to refresh cache: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
+
+
 async def new_member_handler(update, context):
     """Send a welcome message when a new user joins the group"""
     try:
@@ -3,12 +3,18 @@ Media information commands
 Handles nowplaying, stats, upcoming, and trending commands
 """
 
+import asyncio
+import functools
+import heapq
 import logging
-from datetime import datetime, timedelta
-from collections import defaultdict
+import random
+import time
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from operator import itemgetter
 from telegram.ext import CallbackContext
 from telegram.constants import ParseMode
-from httpx import AsyncClient
+from telegram.error import BadRequest
 
 from config import (
     TAUTILLI_URL, TAUTILLI_API_KEY,
@@ -18,39 +24,207 @@ from config import (
 from utils.helpers import (
     send_command_response, escape_md, safe_format_number, format_duration
 )
+from utils.http_client import get_http_client, decode_json
 
 logger = logging.getLogger(__name__)
 
+# Strips MarkdownV2 escapes and emphasis for the plain-text fallback in one pass
+_MD_STRIP_TABLE = str.maketrans("", "", "\\*_")
+
 # --- TMDB Functions ---
+# TMDB results change slowly, so they are cached in-process (seconds)
+TRENDING_CACHE_TTL = 3600
+PROVIDERS_CACHE_TTL = 86400
+# Oldest entries are evicted beyond this many cached lookups
+TMDB_CACHE_MAX_ENTRIES = 512
+
+# key -> (stored_at, value), kept in least-recently-stored order
+_tmdb_cache = OrderedDict()
+
+def _cache_get(key, ttl, allow_stale=False):
+    """Return a cached value younger than ttl (or any age if allow_stale), else None"""
+    entry = _tmdb_cache.get(key)
+    if entry is None:
+        return None
+    if allow_stale or time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def _cache_put(key, value):
+    """Store a value in the TMDB cache, evicting the oldest entries if it is full"""
+    _tmdb_cache[key] = (time.monotonic(), value)
+    _tmdb_cache.move_to_end(key)
+    while len(_tmdb_cache) > TMDB_CACHE_MAX_ENTRIES:
+        _tmdb_cache.popitem(last=False)
+
+# Cap on concurrent TMDB requests, and how often a rate-limited (429) request is tried
+TMDB_MAX_CONCURRENCY = 10
+TMDB_MAX_ATTEMPTS = 3
+_tmdb_semaphore = asyncio.Semaphore(TMDB_MAX_CONCURRENCY)
+
+async def _tmdb_get(client, url, **kwargs):
+    """GET a TMDB URL under the concurrency cap, retrying 429s with jittered backoff"""
+    for attempt in range(TMDB_MAX_ATTEMPTS):
+        async with _tmdb_semaphore:
+            resp = await client.get(url, **kwargs)
+        if resp.status_code != 429 or attempt == TMDB_MAX_ATTEMPTS - 1:
+            return resp
+        retry_after = resp.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+        logger.warning("⚠️ TMDB rate limited - retrying in %.1fs", delay)
+        await asyncio.sleep(delay + random.uniform(0, 0.25))
+    return resp
+
 async def fetch_trending():
     """Fetch trending movies and TV shows from TMDB"""
+    cached = _cache_get("trending", TRENDING_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     headers = {"Authorization": f"Bearer {TMDB_BEARER_TOKEN}", "accept": "application/json"}
-    async with AsyncClient() as client:
-        movies_resp = await client.get(
-            "https://api.themoviedb.org/3/trending/movie/week", headers=headers, params={"language": "en-US"}
-        )
-        shows_resp = await client.get(
-            "https://api.themoviedb.org/3/trending/tv/week", headers=headers, params={"language": "en-US"}
-        )
+    params = {"language": "en-US"}
+    client = get_http_client()
+    # Both lists are independent, so fetch them concurrently
+    movies_resp, shows_resp = await asyncio.gather(
+        _tmdb_get(client, "https://api.themoviedb.org/3/trending/movie/week", headers=headers, params=params),
+        _tmdb_get(client, "https://api.themoviedb.org/3/trending/tv/week", headers=headers, params=params),
+    )
+    if movies_resp.status_code == 200 and shows_resp.status_code == 200:
+        result = (movies_resp.json().get("results", []), shows_resp.json().get("results", []))
+        _cache_put("trending", result)
+        return result
+
+    # Serve the last good lists (even if expired) rather than an empty /hot
+    stale = _cache_get("trending", TRENDING_CACHE_TTL, allow_stale=True)
+    if stale is not None:
+        logger.warning("⚠️ TMDB trending returned %d/%d - serving cached results",
+                       movies_resp.status_code, shows_resp.status_code)
+        return stale
     movies = movies_resp.json().get("results", []) if movies_resp.status_code == 200 else []
     shows = shows_resp.json().get("results", []) if shows_resp.status_code == 200 else []
     return movies, shows
 
-async def fetch_watch_providers(media_type, media_id):
+async def fetch_watch_providers(client, media_type, media_id):
     """Fetch streaming providers for media from TMDB"""
+    cache_key = f"wp:{media_type}:{media_id}"
+    cached = _cache_get(cache_key, PROVIDERS_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     headers = {"Authorization": f"Bearer {TMDB_BEARER_TOKEN}", "accept": "application/json"}
     url = f"https://api.themoviedb.org/3/{media_type}/{media_id}/watch/providers"
-    async with AsyncClient() as client:
-        resp = await client.get(url, headers=headers)
-    results = resp.json().get("results", {}) if resp.status_code == 200 else {}
-    au = results.get("AU", {})
+    resp = await _tmdb_get(client, url, headers=headers)
+    if resp.status_code != 200:
+        stale = _cache_get(cache_key, PROVIDERS_CACHE_TTL, allow_stale=True)
+        return stale if stale is not None else "No streaming info"
+
+    au = resp.json().get("results", {}).get("AU", {})
     if au.get("flatrate"):
-        return ", ".join(item.get("provider_name", "") for item in au["flatrate"])
-    return "No streaming info"
+        providers = ", ".join(item.get("provider_name", "") for item in au["flatrate"])
+    else:
+        providers = "No streaming info"
+    _cache_put(cache_key, providers)
+    return providers
+
+# --- Stale fallback ---
+# Last successful result per upstream fetch: key -> (generated_at, data)
+_last_good = {}
+
+# Stale data older than this is dropped rather than shown as current
+STALE_MAX_AGE = 6 * 3600
+
+def stale_fallback(key, is_failure=lambda result: result is None, max_age=STALE_MAX_AGE):
+    """
+    Serve the last successful result (up to max_age seconds old) when the upstream fails
+
+    The wrapped function returns (result, stale_age) where stale_age is None for live
+    data and the cached data's age in seconds otherwise. Pass fresh_only=True to get
+    the failure result instead of stale data.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, fresh_only=False, **kwargs):
+            result = await func(*args, **kwargs)
+            if not is_failure(result):
+                _last_good[key] = (time.monotonic(), result)
+                return result, None
+            if not fresh_only and key in _last_good:
+                generated_at, data = _last_good[key]
+                age = time.monotonic() - generated_at
+                if age <= max_age:
+                    logger.warning("⚠️ %s unavailable - serving stale data from %d min ago", key, age // 60)
+                    return data, age
+                # Too old to pass off as current
+                del _last_good[key]
+            return result, None
+        return wrapper
+    return decorator
+
+def stale_note_md(stale_age):
+    """MarkdownV2 line telling the user the data shown is cached, or "" for live data"""
+    if stale_age is None:
+        return ""
+    return f"_\\(cached, {int(stale_age // 60)} min old\\)_\n"
 
 # --- Sonarr/Radarr Functions ---
+# Last API version each service answered on, so the v3/v2/v1 probe only runs once
+_arr_api_versions = {"Sonarr": None, "Radarr": None}
+
+# Sonarr seriesId -> title lookup, refreshed every SERIES_LOOKUP_CACHE_TTL seconds
+SERIES_LOOKUP_CACHE_TTL = 600
+_series_lookup_cache = None  # (stored_at, lookup)
+
+def invalidate_series_cache():
+    """Drop the cached Sonarr series lookup so the next /upcoming refetches it"""
+    global _series_lookup_cache
+    _series_lookup_cache = None
+
+async def _probe_arr_calendar(client, service, base_url, headers, params):
+    """Find a working API version for a Sonarr/Radarr calendar, returning (version, items)"""
+    _arr_api_versions[service] = None
+    for api_version in ["v3", "v2", "v1"]:
+        url = f"{base_url}/api/{api_version}/calendar"
+        logger.debug("Trying %s API %s: %s", service, api_version, url)
+        
+        try:
+            resp = await client.get(url, headers=headers, params=params)
+            if resp.status_code == 200:
+                items = decode_json(resp)
+                logger.info("✅ %s calendar fetched using API %s: %d items", service, api_version, len(items))
+                _arr_api_versions[service] = api_version
+                return api_version, items
+            elif resp.status_code == 404:
+                logger.debug("API %s not found, trying next version", api_version)
+                continue
+            else:
+                logger.warning("API %s returned status %d", api_version, resp.status_code)
+                continue
+        except Exception as e:
+            logger.debug("API %s failed: %s", api_version, e)
+            continue
+    return None, None
+
+async def warm_api_versions():
+    """Probe Sonarr/Radarr API versions at startup so the first /upcoming skips the probe"""
+    client = get_http_client()
+    today = datetime.now(MELBOURNE_TZ).date().isoformat()
+    params = {"start": today, "end": today, "unmonitored": "false"}
+    probes = [
+        _probe_arr_calendar(client, service, url.rstrip('/'), {"X-Api-Key": api_key}, params)
+        for service, url, api_key in (
+            ("Sonarr", SONARR_URL, SONARR_API_KEY),
+            ("Radarr", RADARR_URL, RADARR_API_KEY),
+        )
+        if url and api_key
+    ]
+    await asyncio.gather(*probes)
+    logger.info("🔌 Sonarr API: %s, Radarr API: %s",
+                _arr_api_versions["Sonarr"] or "unknown", _arr_api_versions["Radarr"] or "unknown")
+
+@stale_fallback("Sonarr upcoming")
 async def fetch_sonarr_upcoming(client):
     """Get upcoming TV episodes from Sonarr for this week"""
+    global _series_lookup_cache
     if not (SONARR_URL and SONARR_API_KEY):
         return None
     
@@ -67,42 +241,68 @@ async def fetch_sonarr_upcoming(client):
             "unmonitored": "false"  # Only get monitored episodes
         }
         
-        # Try v3 first, then fall back to v2
+        # The series list is large and rarely changes, so reuse a recent lookup
+        series_lookup = None
+        if _series_lookup_cache and time.monotonic() - _series_lookup_cache[0] < SERIES_LOOKUP_CACHE_TTL:
+            series_lookup = _series_lookup_cache[1]
+
         episodes = None
-        for api_version in ["v3", "v2", "v1"]:
-            url = f"{base_url}/api/{api_version}/calendar"
-            logger.debug("Trying Sonarr API %s: %s", api_version, url)
-            
-            try:
-                resp = await client.get(url, headers=headers, params=params)
-                if resp.status_code == 200:
-                    episodes = resp.json()
-                    logger.info("✅ Sonarr episodes fetched using API %s: %d episodes", api_version, len(episodes))
-                    break
-                elif resp.status_code == 404:
-                    logger.debug("API %s not found, trying next version", api_version)
-                    continue
-                else:
-                    logger.warning("API %s returned status %d", api_version, resp.status_code)
-                    continue
-            except Exception as e:
-                logger.debug("API %s failed: %s", api_version, e)
-                continue
+        series_resp = None
+        api_version = _arr_api_versions["Sonarr"]
+        if api_version:
+            # API version already known - fetch the calendar and (if needed) series list together
+            cal_url = f"{base_url}/api/{api_version}/calendar"
+            if series_lookup is None:
+                cal_resp, series_resp = await asyncio.gather(
+                    client.get(cal_url, headers=headers, params=params),
+                    client.get(f"{base_url}/api/{api_version}/series", headers=headers),
+                    return_exceptions=True
+                )
+            else:
+                try:
+                    cal_resp = await client.get(cal_url, headers=headers, params=params)
+                except Exception as e:
+                    cal_resp = e
+            if isinstance(cal_resp, Exception):
+                logger.error("❌ Sonarr calendar failed on API %s: %s", api_version, cal_resp)
+                return None
+            if cal_resp.status_code == 200:
+                episodes = decode_json(cal_resp)
+                logger.info("✅ Sonarr episodes fetched using API %s: %d episodes", api_version, len(episodes))
+            elif cal_resp.status_code == 404:
+                series_resp = None
+            else:
+                logger.error("❌ Sonarr calendar returned status %d on API %s", cal_resp.status_code, api_version)
+                return None
+
+        if episodes is None:
+            # Version unknown (or the cached one now 404s): try v3, then v2, then v1
+            api_version, episodes = await _probe_arr_calendar(client, "Sonarr", base_url, headers, params)
         
-        if not episodes:
+        if episodes is None:
             logger.error("❌ All Sonarr API versions failed")
             return None
+        if not episodes:
+            # A quiet week - nothing to label with series titles
+            return episodes
         
         # Now fetch series information to get the actual series names
         try:
-            series_url = f"{base_url}/api/{api_version}/series"
-            series_resp = await client.get(series_url, headers=headers)
-            if series_resp.status_code == 200:
-                series_data = series_resp.json()
-                # Create a lookup dictionary: seriesId -> series title
-                series_lookup = {series.get("id"): series.get("title", "Unknown Series") for series in series_data}
-                logger.info("✅ Fetched %d series for lookup", len(series_lookup))
-                
+            if series_lookup is None:
+                if series_resp is None:
+                    series_resp = await client.get(f"{base_url}/api/{api_version}/series", headers=headers)
+                elif isinstance(series_resp, Exception):
+                    raise series_resp
+                if series_resp.status_code == 200:
+                    series_data = decode_json(series_resp)
+                    # Create a lookup dictionary: seriesId -> series title
+                    series_lookup = {series.get("id"): series.get("title", "Unknown Series") for series in series_data}
+                    _series_lookup_cache = (time.monotonic(), series_lookup)
+                    logger.info("✅ Fetched %d series for lookup", len(series_lookup))
+                else:
+                    logger.warning("Could not fetch series data, status: %d", series_resp.status_code)
+
+            if series_lookup is not None:
                 # Add series information to episodes
                 for episode in episodes:
                     series_id = episode.get("seriesId")
@@ -112,7 +312,6 @@ async def fetch_sonarr_upcoming(client):
                         episode["seriesTitle"] = "Unknown Series"
                         logger.debug("No series found for episode with seriesId: %s", series_id)
             else:
-                logger.warning("Could not fetch series data, status: %d", series_resp.status_code)
                 # Fallback: set all to unknown
                 for episode in episodes:
                     episode["seriesTitle"] = "Unknown Series"
@@ -128,6 +327,7 @@ async def fetch_sonarr_upcoming(client):
         logger.error("❌ Sonarr fetch failed: %s", e)
         return None
 
+@stale_fallback("Radarr upcoming")
 async def fetch_radarr_upcoming(client):
     """Get upcoming movie releases from Radarr for the next month"""
     if not (RADARR_URL and RADARR_API_KEY):
@@ -146,26 +346,21 @@ async def fetch_radarr_upcoming(client):
             "unmonitored": "false"  # Only get monitored movies
         }
         
-        # Try v3 first, then fall back to v2
-        for api_version in ["v3", "v2", "v1"]:
-            url = f"{base_url}/api/{api_version}/calendar"
-            logger.debug("Trying Radarr API %s: %s", api_version, url)
-            
-            try:
-                resp = await client.get(url, headers=headers, params=params)
-                if resp.status_code == 200:
-                    movies = resp.json()
-                    logger.info("✅ Radarr movies fetched using API %s: %d movies", api_version, len(movies))
-                    return movies
-                elif resp.status_code == 404:
-                    logger.debug("API %s not found, trying next version", api_version)
-                    continue
-                else:
-                    logger.warning("API %s returned status %d", api_version, resp.status_code)
-                    continue
-            except Exception as e:
-                logger.debug("API %s failed: %s", api_version, e)
-                continue
+        api_version = _arr_api_versions["Radarr"]
+        if api_version:
+            resp = await client.get(f"{base_url}/api/{api_version}/calendar", headers=headers, params=params)
+            if resp.status_code == 200:
+                movies = decode_json(resp)
+                logger.info("✅ Radarr movies fetched using API %s: %d movies", api_version, len(movies))
+                return movies
+            if resp.status_code != 404:
+                logger.error("❌ Radarr calendar returned status %d on API %s", resp.status_code, api_version)
+                return None
+
+        # Version unknown (or the cached one now 404s): try v3, then v2, then v1
+        api_version, movies = await _probe_arr_calendar(client, "Radarr", base_url, headers, params)
+        if api_version:
+            return movies
         
         logger.error("❌ All Radarr API versions failed")
         return None
@@ -174,123 +369,155 @@ async def fetch_radarr_upcoming(client):
         logger.error("❌ Radarr fetch failed: %s", e)
         return None
 
+# Sort key for Sonarr episodes; missing air dates are filled with the sentinel so they sort last
+_AIRDATE_UNKNOWN = "9999-12-31"
+_airdate_key = itemgetter("airDate")
+
 def format_sonarr_episode(episode):
     """Format a Sonarr episode for display"""
     try:
-        # Get series title (now populated by fetch function)
-        series_title = episode.get("seriesTitle", "Unknown Series")
-        
-        season_num = episode.get("seasonNumber", 0)
-        episode_num = episode.get("episodeNumber", 0)
-        episode_title = episode.get("title", "TBA")
-        
-        # Debug logging
-        logger.debug("Formatting episode: Series='%s', S%02dE%02d, Title='%s'", 
-                    series_title, season_num, episode_num, episode_title)
-        
-        # Air date
-        air_date_str = episode.get("airDate", "")
-        if air_date_str:
-            try:
-                air_date = datetime.fromisoformat(air_date_str.replace('Z', '+00:00'))
-                air_date_local = air_date.astimezone(MELBOURNE_TZ)
-                formatted_date = air_date_local.strftime("%a %b %d")
-            except:
-                formatted_date = air_date_str
-        else:
-            formatted_date = "TBA"
-        
-        # Check if downloaded
-        has_file = episode.get("hasFile", False)
-        status = "📁" if has_file else "⏳"
-        
-        # Format: "Series S01E05: Episode Title - Mon Jan 15 📁"
-        series_safe = escape_md(series_title)
-        episode_safe = escape_md(episode_title)
-        date_safe = escape_md(formatted_date)
-        
-        return f"\\- {series_safe} S{season_num:02d}E{episode_num:02d}\\: {episode_safe} \\- {date_safe} {status}"
-        
+        return _format_sonarr_row(
+            episode.get("seriesTitle", "Unknown Series"),  # populated by fetch function
+            episode.get("seasonNumber", 0),
+            episode.get("episodeNumber", 0),
+            episode.get("title", "TBA"),
+            "" if (air_date := episode.get("airDate", "")) == _AIRDATE_UNKNOWN else air_date,
+            episode.get("hasFile", False),
+        )
     except Exception as e:
         logger.error("Error formatting Sonarr episode: %s", e)
         return f"\\- Unknown Series \\- Error formatting"
 
-def format_radarr_movie(movie):
+@functools.lru_cache(maxsize=2048)
+def _format_sonarr_row(series_title, season_num, episode_num, episode_title, air_date_str, has_file):
+    """Build an episode row; memoized since the same episodes are rendered on every /upcoming"""
+    # Debug logging
+    logger.debug("Formatting episode: Series='%s', S%02dE%02d, Title='%s'", 
+                series_title, season_num, episode_num, episode_title)
+    
+    # Air date
+    if air_date_str:
+        try:
+            air_date = datetime.fromisoformat(air_date_str.replace('Z', '+00:00'))
+            air_date_local = air_date.astimezone(MELBOURNE_TZ)
+            formatted_date = air_date_local.strftime("%a %b %d")
+        except:
+            formatted_date = air_date_str
+    else:
+        formatted_date = "TBA"
+    
+    # Check if downloaded
+    status = "📁" if has_file else "⏳"
+    
+    # Format: "Series S01E05: Episode Title - Mon Jan 15 📁" (escaped in one pass)
+    line = escape_md(f"- {series_title} S{season_num:02d}E{episode_num:02d}: {episode_title} - {formatted_date}")
+    
+    return f"{line} {status}"
+
+# Radarr release date fields with their display label and emoji
+_RELEASE_TYPES = (
+    ("inCinemas", "Cinema", "🎬"),
+    ("digitalRelease", "Digital", "💻"),
+    ("physicalRelease", "Physical", "📀"),
+)
+
+def format_radarr_movie(movie, now=None):
     """Format a Radarr movie for display with release type information - upcoming releases in next month"""
     try:
-        # Basic info
-        title = movie.get("title", "Unknown Movie")
-        year = movie.get("year", "")
-        
-        # Get all release dates
-        cinema_date = movie.get("inCinemas", "")
-        digital_date = movie.get("digitalRelease", "")
-        physical_date = movie.get("physicalRelease", "")
-        
-        # Check if downloaded
-        has_file = movie.get("hasFile", False)
-        status = "📁" if has_file else "⏳"
-        
-        # Process dates and determine what to show
-        releases = []
-        now = datetime.now(MELBOURNE_TZ).date()
-        month_from_now = now + timedelta(days=30)  # Show next month instead of next week
-        
-        # Parse and categorize dates - ONLY include future dates in next month
-        for date_str, release_type, emoji in [
-            (cinema_date, "Cinema", "🎬"),
-            (digital_date, "Digital", "💻"), 
-            (physical_date, "Physical", "📀")
-        ]:
-            if date_str:
-                try:
-                    release_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
+        if now is None:
+            now = datetime.now(MELBOURNE_TZ).date()
+        return _format_radarr_row(
+            movie.get("title", "Unknown Movie"),
+            movie.get("year", ""),
+            movie.get("hasFile", False),
+            tuple(movie.get(key, "") for key, _, _ in _RELEASE_TYPES),
+            now,
+        )
+    except Exception as e:
+        logger.error("Error formatting Radarr movie: %s", e)
+        return f"\\- {escape_md(movie.get('title', 'Unknown'))} \\- Error formatting"
+
+@functools.lru_cache(maxsize=2048)
+def _format_radarr_row(title, year, has_file, date_strs, now):
+    """Build a movie row, or None if nothing releases in the next month; memoized per day"""
+    # Check if downloaded
+    status = "📁" if has_file else "⏳"
+    
+    # Process dates and determine what to show
+    releases = []
+    month_from_now = now + timedelta(days=30)  # Show next month instead of next week
+    
+    # Parse and categorize dates - ONLY include future dates in next month
+    for (_, release_type, emoji), date_str in zip(_RELEASE_TYPES, date_strs):
+        if date_str:
+            try:
+                release_date = date.fromisoformat(date_str[:10])
+                
+                # Only include future releases within the next month
+                if now <= release_date <= month_from_now:
+                    formatted_date = release_date.strftime("%b %d")
                     
-                    # Only include future releases within the next month
-                    if now <= release_date <= month_from_now:
-                        formatted_date = release_date.strftime("%b %d")
-                        
-                        releases.append({
-                            'date': release_date,
-                            'type': release_type,
-                            'emoji': emoji,
-                            'display': formatted_date,
-                            'is_future': True  # All releases here are future
-                        })
-                except:
-                    continue
-        
-        # If no upcoming releases in the next month, don't show this movie
-        if not releases:
-            return None
-        
-        # Sort releases by date
-        releases.sort(key=lambda x: x['date'])
-        
-        # Build the display string
-        title_safe = escape_md(title)
-        year_safe = escape_md(f"({year})" if year else "")
-        
-        # Show the earliest release
-        main_release = releases[0]
-        main_display = f"{main_release['emoji']} {escape_md(main_release['display'])}"
-        
-        # Add additional releases if there are multiple
-        if len(releases) > 1:
-            other_releases = releases[1:]
-            if other_releases:
-                other_display = ", ".join([f"{r['emoji']}{escape_md(r['display'])}" for r in other_releases[:2]])
-                release_info = f"{main_display} \\| {other_display}"
-            else:
-                release_info = main_display
+                    releases.append({
+                        'date': release_date,
+                        'type': release_type,
+                        'emoji': emoji,
+                        'display': formatted_date,
+                        'is_future': True  # All releases here are future
+                    })
+            except:
+                continue
+    
+    # If no upcoming releases in the next month, don't show this movie
+    if not releases:
+        return None
+    
+    # Sort releases by date
+    releases.sort(key=itemgetter('date'))
+    
+    # Build the display string
+    title_year_safe = escape_md(f"{title} ({year})" if year else title)
+    
+    # Show the earliest release
+    main_release = releases[0]
+    # "%b %d" dates contain no MarkdownV2 specials, so only the title needs escaping
+    main_display = f"{main_release['emoji']} {main_release['display']}"
+    
+    # Add additional releases if there are multiple
+    if len(releases) > 1:
+        other_releases = releases[1:]
+        if other_releases:
+            other_display = ", ".join([f"{r['emoji']}{r['display']}" for r in other_releases[:2]])
+            release_info = f"{main_display} \\| {other_display}"
         else:
             release_info = main_display
-            
-        return f"\\- {title_safe} {year_safe} \\- {release_info} {status}"
+    else:
+        release_info = main_display
         
-    except Exception as e:
-        logger.error("Error formatting Radarr movie: %s", e)
-        return f"\\- {escape_md(movie.get('title', 'Unknown'))} \\- Error formatting"
+    return f"\\- {title_year_safe} \\- {release_info} {status}"
+
+def _parse_release_date(date_str, cache):
+    """Parse an ISO release timestamp to a date, memoized in cache"""
+    parsed = cache.get(date_str)
+    if parsed is None:
+        # Only the YYYY-MM-DD prefix matters; skip building an aware datetime
+        parsed = date.fromisoformat(date_str[:10])
+        cache[date_str] = parsed
+    return parsed
+
+def get_sort_date(movie, now, cache):
+    """Get the earliest upcoming release date of a Radarr movie, or None if it has none"""
+    dates = []
+    for key, _, _ in _RELEASE_TYPES:
+        date_str = movie.get(key, "")
+        if date_str:
+            try:
+                release_date = _parse_release_date(date_str, cache)
+            except ValueError:
+                continue
+            if release_date >= now:  # Future dates only for sorting
+                dates.append(release_date)
+    
+    return min(dates) if dates else None
 
 # --- Tautulli Functions ---
 def get_stream_type(session_data):
@@ -324,23 +551,30 @@ def get_stream_type(session_data):
         logger.error("Error determining stream type: %s", e)
         return "Unknown"
 
+@stale_fallback("Tautulli stats", is_failure=lambda result: result[1] is None)
 async def fetch_tautulli_stats(client, time_range=7):
     """Fetch viewing statistics from Tautulli"""
     try:
         base_url = TAUTILLI_URL.rstrip('/')
         
-        # Test connectivity
-        logger.info("🔍 Testing Tautulli API connectivity...")
-        test_url = f"{base_url}/api/v2?apikey={TAUTILLI_API_KEY}&cmd=get_activity"
-        test_resp = await client.get(test_url)
-        test_resp.raise_for_status()
+        # Connectivity check, history and user stats are independent - fetch them concurrently
+        logger.info("📊 Fetching Tautulli activity, history and user stats...")
+        api_url = f"{base_url}/api/v2"
+        test_resp, history_resp, user_resp = await asyncio.gather(
+            client.get(api_url, params={"apikey": TAUTILLI_API_KEY, "cmd": "get_activity"}),
+            client.get(api_url, params={"apikey": TAUTILLI_API_KEY, "cmd": "get_history", "length": 200}),
+            client.get(
+                api_url,
+                params={"apikey": TAUTILLI_API_KEY, "cmd": "get_user_watch_time_stats", "time_range": time_range}
+            ),
+            return_exceptions=True
+        )
+        for resp in (test_resp, history_resp):
+            if isinstance(resp, Exception):
+                raise resp
+            resp.raise_for_status()
         logger.info("✅ Tautulli API connection successful")
         
-        # Get history data
-        logger.info("📊 Fetching Tautulli history...")
-        history_url = f"{base_url}/api/v2?apikey={TAUTILLI_API_KEY}&cmd=get_history&length=200"
-        history_resp = await client.get(history_url)
-        history_resp.raise_for_status()
         history_result = history_resp.json()
         
         if history_result.get("response", {}).get("result") != "success":
@@ -350,13 +584,11 @@ async def fetch_tautulli_stats(client, time_range=7):
         history_data = history_result.get("response", {}).get("data", {}).get("data", [])
         logger.info("✅ Retrieved %d history items", len(history_data))
         
-        # Try to get user stats
+        # User stats are optional
         user_data = None
         try:
-            logger.info("📊 Fetching user watch time stats...")
-            user_stats_url = f"{base_url}/api/v2?apikey={TAUTILLI_API_KEY}&cmd=get_user_watch_time_stats&time_range={time_range}"
-            user_resp = await client.get(user_stats_url)
-            
+            if isinstance(user_resp, Exception):
+                raise user_resp
             if user_resp.status_code == 200:
                 user_result = user_resp.json()
                 if user_result.get("response", {}).get("result") == "success":
@@ -371,196 +603,235 @@ async def fetch_tautulli_stats(client, time_range=7):
         logger.error("❌ Failed to fetch Tautulli stats: %s", e)
         return None, None
 
-def calculate_user_stats_from_history(history_data, days=7):
-    """Calculate user stats from history data if API doesn't provide them"""
-    if not history_data:
-        return []
-    
-    cutoff_date = datetime.now() - timedelta(days=days)
-    user_stats = defaultdict(lambda: {"total_time": 0, "total_plays": 0})
-    
+# Per-title unique viewers are only counted up to this many (shown as "64+")
+UNIQUE_USERS_CAP = 64
+
+def _normalize_history(history_data):
+    """Yield (timestamp, user, title, duration) per history row, skipping malformed rows"""
     for item in history_data:
         try:
-            item_date = datetime.fromtimestamp(int(item.get("date", 0)))
-            if item_date < cutoff_date:
-                continue
-                
-            user = item.get("user", "Unknown")
-            duration = int(item.get("duration", 0) or 0)
-            
-            user_stats[user]["total_time"] += duration
-            user_stats[user]["total_plays"] += 1
-            
+            yield (
+                int(item.get("date") or 0),
+                item.get("user", "Unknown"),
+                item.get("full_title") or item.get("title", "Unknown"),
+                int(item.get("duration") or 0),
+            )
         except (ValueError, TypeError):
             continue
-    
-    return [{"user": user, **stats} for user, stats in user_stats.items()]
 
-def analyze_most_watched_content(history_data, days=7):
-    """Analyze history data to find most watched content"""
+def _aggregate_history(history_data, days=7):
+    """
+    Aggregate history in a single pass
+
+    Returns (user_stats, most_watched): per-user watch totals (used when the
+    user stats API is unavailable) and the top 10 titles by play count.
+    """
     if not history_data:
-        return []
+        return [], []
     
-    cutoff_date = datetime.now() - timedelta(days=days)
-    content_plays = defaultdict(lambda: {"plays": 0, "users": set(), "duration": 0})
+    # Compare raw epoch seconds rather than building a datetime per row
+    cutoff_ts = (datetime.now() - timedelta(days=days)).timestamp()
+    # Plain dicts of lists: user -> [total_time, total_plays], title -> [plays, users, duration]
+    user_stats = {}
+    content_plays = {}
     
-    for item in history_data:
-        try:
-            item_date = datetime.fromtimestamp(int(item.get("date", 0)))
-            if item_date < cutoff_date:
-                continue
-                
-            title = item.get("full_title") or item.get("title", "Unknown")
-            user = item.get("user", "Unknown")
-            duration = int(item.get("duration", 0) or 0)
-            
-            content_plays[title]["plays"] += 1
-            content_plays[title]["users"].add(user)
-            content_plays[title]["duration"] += duration
-            
-        except (ValueError, TypeError):
+    for ts, user, title, duration in _normalize_history(history_data):
+        if ts < cutoff_ts:
             continue
+
+        user_row = user_stats.get(user)
+        if user_row is None:
+            user_row = user_stats[user] = [0, 0]
+        user_row[0] += duration
+        user_row[1] += 1
+
+        row = content_plays.get(title)
+        if row is None:
+            row = content_plays[title] = [0, set(), 0]
+        row[0] += 1
+        if len(row[1]) < UNIQUE_USERS_CAP:
+            row[1].add(user)
+        row[2] += duration
     
-    return sorted([(title, data) for title, data in content_plays.items()], 
-                  key=lambda x: x[1]["plays"], reverse=True)[:10]
+    user_stats_list = [
+        {"user": user, "total_time": total_time, "total_plays": total_plays}
+        for user, (total_time, total_plays) in user_stats.items()
+    ]
+    top_content = sorted(content_plays.items(), key=lambda x: x[1][0], reverse=True)[:10]
+    most_watched = [
+        (title, {"plays": plays, "users": users, "duration": duration})
+        for title, (plays, users, duration) in top_content
+    ]
+    return user_stats_list, most_watched
 
 # --- Command Functions ---
-async def nowplaying_command(update, context: CallbackContext):
-    """Show current playing sessions"""
+async def _fetch_tautulli_activity(client):
+    """Fetch current Plex sessions from Tautulli, returning (sessions, wan_kbps)"""
+    taut_url = TAUTILLI_URL.rstrip('/') + "/api/v2"
+    taut_resp = await client.get(taut_url, params={"apikey": TAUTILLI_API_KEY, "cmd": "get_activity"})
+    taut_resp.raise_for_status()
+    taut_data = taut_resp.json().get("response", {}).get("data", {})
+    return taut_data.get("sessions", []), taut_data.get("wan_bandwidth", 0)
+
+# Rendered /nowplaying message, shared by calls within NOWPLAYING_CACHE_TTL seconds
+NOWPLAYING_CACHE_TTL = 8
+_nowplaying_cache = {"ts": 0.0, "msg": None}
+# Single-flight: concurrent /nowplaying calls wait for one fetch instead of each hitting Tautulli
+_nowplaying_lock = asyncio.Lock()
+
+async def _build_nowplaying_message():
+    """Fetch current sessions and render /nowplaying, returning (msg, ok)"""
+    client = get_http_client()
+    lines = ["🎥 *Now Playing*"]
+    ok = True
+    
+    # Tautulli data (Plex)
     try:
-        async with AsyncClient() as client:
-            lines = ["🎥 *Now Playing*"]
-            
-            # Tautulli data (Plex)
-            try:
-                taut_url = TAUTILLI_URL.rstrip('/') + f"/api/v2?apikey={TAUTILLI_API_KEY}&cmd=get_activity"
-                taut_resp = await client.get(taut_url)
-                taut_resp.raise_for_status()
-                taut_data = taut_resp.json().get("response", {}).get("data", {})
-                sessions = taut_data.get("sessions", [])
-
-                if sessions:
-                    lines.append("\n*Plex:*")
-                    for s in sessions:
-                        user = escape_md(s.get("username", "Unknown"))
-                        show = s.get("grandparent_title") or s.get("parent_title") or ""
-                        ep = s.get("title", "")
-                        full = f"{show}: {ep}" if show else ep
-                        title = escape_md(full)
-                        
-                        stream_type = get_stream_type(s)
-                        stream = escape_md(stream_type)
-                        state = escape_md(s.get("state", ""))
-                        
-                        lines.append(f"\\- {user} – {title} – {stream} \\({state}\\)")
-
-                    # WAN bandwidth
-                    wan_kbps = taut_data.get("wan_bandwidth", 0)
-                    if wan_kbps > 0:
-                        wan_mbps = wan_kbps / 1000
-                        wan_text = safe_format_number(wan_mbps, 1)
-                        lines.append(f"\\- WAN upload: {wan_text} Mbps")
-                else:
-                    lines.append("\n*Plex:* No active streams")
-                    
-                logger.info("✅ Tautulli data fetched successfully")
+        sessions, wan_kbps = await _fetch_tautulli_activity(client)
+
+        if sessions:
+            lines.append("\n*Plex:*")
+            for s in sessions:
+                user = escape_md(s.get("username", "Unknown"))
+                show = s.get("grandparent_title") or s.get("parent_title") or ""
+                ep = s.get("title", "")
+                full = f"{show}: {ep}" if show else ep
+                title = escape_md(full)
                 
-            except Exception as e:
-                logger.error("❌ Tautulli fetch failed: %s", e)
-                lines.append("\n*Plex:* Data unavailable")
+                stream_type = get_stream_type(s)
+                stream = escape_md(stream_type)
+                state = escape_md(s.get("state", ""))
+                
+                lines.append(f"\\- {user} – {title} – {stream} \\({state}\\)")
+
+            # WAN bandwidth
+            if wan_kbps > 0:
+                wan_mbps = wan_kbps / 1000
+                wan_text = safe_format_number(wan_mbps, 1)
+                lines.append(f"\\- WAN upload: {wan_text} Mbps")
+        else:
+            lines.append("\n*Plex:* No active streams")
+            
+        logger.info("✅ Tautulli data fetched successfully")
+        
+    except Exception as e:
+        logger.error("❌ Tautulli fetch failed: %s", e)
+        lines.append("\n*Plex:* Data unavailable")
+        ok = False
 
-        msg = "\n".join(lines)
+    return "\n".join(lines), ok
+
+async def nowplaying_command(update, context: CallbackContext):
+    """Show current playing sessions"""
+    try:
+        async with _nowplaying_lock:
+            if _nowplaying_cache["msg"] and time.monotonic() - _nowplaying_cache["ts"] < NOWPLAYING_CACHE_TTL:
+                msg = _nowplaying_cache["msg"]
+            else:
+                msg, ok = await _build_nowplaying_message()
+                # Failures aren't cached so the next call retries Tautulli
+                if ok:
+                    _nowplaying_cache["msg"] = msg
+                    _nowplaying_cache["ts"] = time.monotonic()
         
         try:
             await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
         except Exception as markdown_error:
             logger.error("❌ Markdown parsing error: %s", markdown_error)
-            plain_msg = msg.replace("\\", "").replace("*", "").replace("_", "")
+            plain_msg = msg.translate(_MD_STRIP_TABLE)
             await send_command_response(update, context, f"🎥 Now Playing\n\n{plain_msg}")
         
     except Exception as e:
         logger.error("❌ Error in nowplaying command: %s", e)
         await send_command_response(update, context, "❌ Could not fetch now playing data. Check logs for details.")
 
+# Ranking emoji for the top three entries in /stats
+_MEDALS = ("🥇", "🥈", "🥉")
+
 async def stats_command(update, context: CallbackContext):
     """Show weekly viewing statistics"""
     try:
-        async with AsyncClient() as client:
-            await send_command_response(update, context, "📊 Fetching weekly stats\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
-            
-            user_stats, history_data = await fetch_tautulli_stats(client)
-            
-            if not history_data:
-                await send_command_response(update, context, "❌ Could not fetch statistics\\. Check Tautulli connection\\.", parse_mode=ParseMode.MARKDOWN_V2)
-                return
-            
-            # Calculate from history if needed
-            if not user_stats and history_data:
-                logger.info("📊 User stats API unavailable, calculating from history data...")
-                user_stats = calculate_user_stats_from_history(history_data)
-                logger.info("✅ Calculated stats for %d users from history", len(user_stats))
-            
-            # Build message
-            end_date = datetime.now(MELBOURNE_TZ)
-            start_date = end_date - timedelta(days=7)
-            date_range = f"{start_date.strftime('%d %b')} \\- {end_date.strftime('%d %b %Y')}"
-            
-            msg = f"📊 *Weekly Stats* \\({date_range}\\)\n\n"
+        client = get_http_client()
+        await send_command_response(update, context, "📊 Fetching weekly stats\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        
+        (user_stats, history_data), stale_age = await fetch_tautulli_stats(client)
+        
+        if not history_data:
+            await send_command_response(update, context, "❌ Could not fetch statistics\\. Check Tautulli connection\\.", parse_mode=ParseMode.MARKDOWN_V2)
+            return
+        
+        # One pass over history yields both the fallback user stats and top content
+        history_user_stats, most_watched = _aggregate_history(history_data)
+
+        # Calculate from history if needed
+        if not user_stats and history_data:
+            logger.info("📊 User stats API unavailable, calculating from history data...")
+            user_stats = history_user_stats
+            logger.info("✅ Calculated stats for %d users from history", len(user_stats))
+        
+        # Build message
+        end_date = datetime.now(MELBOURNE_TZ)
+        start_date = end_date - timedelta(days=7)
+        date_range = f"{start_date.strftime('%d %b')} \\- {end_date.strftime('%d %b %Y')}"
+        
+        parts = [f"📊 *Weekly Stats* \\({date_range}\\)\n", stale_note_md(stale_age), "\n"]
+        
+        # Top Users section
+        if user_stats:
+            parts.append("*🏆 Top Users \\(Watch Time\\):*\n")
+            sorted_users = sorted(user_stats, key=lambda x: int(x.get("total_time", 0) or 0), reverse=True)
             
-            # Top Users section
-            if user_stats:
-                msg += "*🏆 Top Users \\(Watch Time\\):*\n"
-                sorted_users = sorted(user_stats, key=lambda x: int(x.get("total_time", 0) or 0), reverse=True)
-                
-                for i, user in enumerate(sorted_users[:5], 1):
-                    username = escape_md(user.get("user", "Unknown"))
-                    total_time = int(user.get("total_time", 0) or 0)
-                    plays = user.get("total_plays", 0)
-                    duration_str = escape_md(format_duration(total_time))
-                    
-                    emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}\\."
-                    msg += f"{emoji} {username} – {duration_str} \\({plays} plays\\)\n"
+            for i, user in enumerate(sorted_users[:5], 1):
+                username = escape_md(user.get("user", "Unknown"))
+                total_time = int(user.get("total_time", 0) or 0)
+                plays = user.get("total_plays", 0)
+                duration_str = escape_md(format_duration(total_time))
                 
-                if not sorted_users:
-                    msg += "No viewing data available\\.\n"
-            else:
-                msg += "*🏆 Top Users:* Data unavailable\n"
-            
-            # Most Watched Content section
-            most_watched = analyze_most_watched_content(history_data)
-            msg += "\n*🎬 Most Watched Content:*\n"
-            
-            if most_watched:
-                for i, (title, data) in enumerate(most_watched[:5], 1):
-                    title_clean = escape_md(title[:50] + "..." if len(title) > 50 else title)
-                    plays = data["plays"]
-                    unique_users = len(data["users"])
-                    total_duration = format_duration(data["duration"])
-                    
-                    emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}\\."
-                    msg += f"{emoji} {title_clean}\n"
-                    msg += f"   {plays} plays by {unique_users} user{'s' if unique_users != 1 else ''} \\({escape_md(total_duration)}\\)\n"
-            else:
-                msg += "No content data available\\.\n"
+                emoji = _MEDALS[i - 1] if i <= len(_MEDALS) else f"{i}\\."
+                parts.append(f"{emoji} {username} – {duration_str} \\({plays} plays\\)\n")
             
-            # Summary stats
-            if user_stats and history_data:
-                total_users = len([u for u in user_stats if int(u.get("total_time", 0) or 0) > 0])
-                total_plays = sum(int(u.get("total_plays", 0) or 0) for u in user_stats)
-                total_time = sum(int(u.get("total_time", 0) or 0) for u in user_stats)
+            if not sorted_users:
+                parts.append("No viewing data available\\.\n")
+        else:
+            parts.append("*🏆 Top Users:* Data unavailable\n")
+        
+        # Most Watched Content section
+        parts.append("\n*🎬 Most Watched Content:*\n")
+        
+        if most_watched:
+            for i, (title, data) in enumerate(most_watched[:5], 1):
+                title_clean = escape_md(title[:50] + "..." if len(title) > 50 else title)
+                plays = data["plays"]
+                unique_users = len(data["users"])
+                users_label = f"{unique_users}\\+" if unique_users >= UNIQUE_USERS_CAP else str(unique_users)
+                total_duration = format_duration(data["duration"])
                 
-                msg += f"\n*📈 Week Summary:*\n"
-                msg += f"\\- Active users: {total_users}\n"
-                msg += f"\\- Total plays: {total_plays}\n"
-                msg += f"\\- Total watch time: {escape_md(format_duration(total_time))}"
-            
-            try:
-                await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
-            except Exception as markdown_error:
-                logger.error("❌ Markdown parsing error: %s", markdown_error)
-                plain_msg = msg.replace("\\", "").replace("*", "").replace("_", "")
-                await send_command_response(update, context, f"📊 Weekly Stats\n\n{plain_msg}")
+                emoji = _MEDALS[i - 1] if i <= len(_MEDALS) else f"{i}\\."
+                parts.append(f"{emoji} {title_clean}\n")
+                parts.append(f"   {plays} plays by {users_label} user{'s' if unique_users != 1 else ''} \\({escape_md(total_duration)}\\)\n")
+        else:
+            parts.append("No content data available\\.\n")
+        
+        # Summary stats
+        if user_stats and history_data:
+            total_users = len([u for u in user_stats if int(u.get("total_time", 0) or 0) > 0])
+            total_plays = sum(int(u.get("total_plays", 0) or 0) for u in user_stats)
+            total_time = sum(int(u.get("total_time", 0) or 0) for u in user_stats)
             
+            parts.append(f"\n*📈 Week Summary:*\n")
+            parts.append(f"\\- Active users: {total_users}\n")
+            parts.append(f"\\- Total plays: {total_plays}\n")
+            parts.append(f"\\- Total watch time: {escape_md(format_duration(total_time))}")
+        
+        msg = "".join(parts)
+        
+        try:
+            await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
+        except Exception as markdown_error:
+            logger.error("❌ Markdown parsing error: %s", markdown_error)
+            plain_msg = msg.translate(_MD_STRIP_TABLE)
+            await send_command_response(update, context, f"📊 Weekly Stats\n\n{plain_msg}")
+        
     except Exception as e:
         logger.error("❌ Error in stats command: %s", e)
         await send_command_response(update, context, "❌ Could not fetch statistics\\. Check logs for details\\.", parse_mode=ParseMode.MARKDOWN_V2)
@@ -572,24 +843,41 @@ async def hot_command(update, context: CallbackContext):
         logger.info("🔥 Manual hot command triggered by user %s", update.effective_user.username or update.effective_user.id)
         
         movies, shows = await fetch_trending()
+        movies, shows = movies[:7], shows[:5]
+
+        # Look up every item's providers concurrently over one client
+        client = get_http_client()
+        providers = await asyncio.gather(
+            *(fetch_watch_providers(client, "movie", m.get("id", 0)) for m in movies),
+            *(fetch_watch_providers(client, "tv", s.get("id", 0)) for s in shows),
+            return_exceptions=True
+        )
+        providers = [
+            "No streaming info" if isinstance(p, Exception) else p
+            for p in providers
+        ]
+        movie_providers, show_providers = providers[:len(movies)], providers[len(movies):]
+
         today = datetime.now(MELBOURNE_TZ).strftime("%d %b %Y")
         date_md = escape_md(f"({today})")
-        msg = f"🎬 *What's Hot This Week* {date_md}\n\n*Movies:*\n"
+        parts = [f"🎬 *What's Hot This Week* {date_md}\n\n*Movies:*\n"]
         
-        for m in movies[:7]:
+        for m, movie_provider in zip(movies, movie_providers):
             title = escape_md(m.get("title", "Unknown"))
             rel_date = escape_md(f"({m.get('release_date','?')})")
             rating = safe_format_number(m.get("vote_average", 0), 1)
-            providers = escape_md(await fetch_watch_providers("movie", m.get("id", 0)))
-            msg += f"\\- {title} {rel_date} – ⭐ {rating} \\| {providers}\n"
+            provider_md = escape_md(movie_provider)
+            parts.append(f"\\- {title} {rel_date} – ⭐ {rating} \\| {provider_md}\n")
             
-        msg += "\n*TV Shows:*\n"
-        for s in shows[:5]:
+        parts.append("\n*TV Shows:*\n")
+        for s, show_provider in zip(shows, show_providers):
             name = escape_md(s.get("name", "Unknown"))
             air_date = escape_md(f"({s.get('first_air_date','?')})")
             rating = safe_format_number(s.get("vote_average", 0), 1)
-            providers = escape_md(await fetch_watch_providers("tv", s.get("id", 0)))
-            msg += f"\\- {name} {air_date} – ⭐ {rating} \\| {providers}\n"
+            provider_md = escape_md(show_provider)
+            parts.append(f"\\- {name} {air_date} – ⭐ {rating} \\| {provider_md}\n")
+        
+        msg = "".join(parts)
         
         await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
         logger.info("✅ Manual hot message sent successfully")
@@ -598,113 +886,153 @@ async def hot_command(update, context: CallbackContext):
         logger.error("❌ Hot command failed: %s", e)
         await send_command_response(update, context, "❌ Could not fetch trending content\\. Check logs for details\\.", parse_mode=ParseMode.MARKDOWN_V2)
 
+# Static /upcoming message fragments (already MarkdownV2-escaped)
+_UPCOMING_FETCHING_MD = "📅 Fetching upcoming releases\\.\\.\\."
+_UPCOMING_NO_SERVICES_MD = "❌ No Sonarr/Radarr configured\\. Check environment variables\\."
+_UPCOMING_HEADER_MD = "📅 *Upcoming Releases*\n\n"
+_UPCOMING_LEGEND_MD = (
+    "*Legend:*\n"
+    "📁 Downloaded \\| ⏳ Awaiting release\n"
+    "🎬 Cinema \\| 💻 Digital \\| 📀 Physical"
+)
+_TV_HEADER_TMPL = "*📺 TV Episodes* \\({range}\\)"
+_MOVIE_HEADER_TMPL = "*🎬 Movies* \\({range}\\)"
+
+@functools.lru_cache(maxsize=8)
+def _date_ranges(day_ordinal):
+    """Escaped TV (week) and movie (month) date ranges for /upcoming, computed once per day"""
+    today = date.fromordinal(day_ordinal)
+    week_end = today + timedelta(days=7)
+    month_end = today + timedelta(days=30)
+    tv_date_range = f"{today.strftime('%b %d')} \\- {week_end.strftime('%b %d, %Y')}"
+    movie_date_range = f"{today.strftime('%b %d')} \\- {month_end.strftime('%b %d, %Y')}"
+    return tv_date_range, movie_date_range
+
+async def _replace_placeholder(update, context, placeholder, text, parse_mode=None):
+    """Edit a "fetching" placeholder into the final text, or send it fresh if the edit isn't possible
+
+    MarkdownV2 parse errors are re-raised so the caller can retry as plain text.
+    """
+    if placeholder is not None:
+        try:
+            await placeholder.edit_text(text, parse_mode=parse_mode)
+            return
+        except BadRequest as e:
+            if "can't parse" in str(e).lower():
+                raise
+            logger.warning("⚠️ Could not edit upcoming placeholder, sending new message: %s", e)
+        except Exception as e:
+            logger.warning("⚠️ Could not edit upcoming placeholder, sending new message: %s", e)
+    await send_command_response(update, context, text, parse_mode=parse_mode)
+
 async def upcoming_command(update, context: CallbackContext):
     """Show upcoming TV episodes and movies for this week"""
     try:
-        async with AsyncClient() as client:
-            await send_command_response(update, context, "📅 Fetching upcoming releases\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
-            
-            # Fetch data from both services
-            sonarr_episodes = await fetch_sonarr_upcoming(client)
-            radarr_movies = await fetch_radarr_upcoming(client)
-            
-            # Build message
-            today = datetime.now(MELBOURNE_TZ)
-            week_end = today + timedelta(days=7)
-            month_end = today + timedelta(days=30)
-            
-            # Different date ranges for TV (week) and Movies (month)
-            tv_date_range = f"{today.strftime('%b %d')} \\- {week_end.strftime('%b %d, %Y')}"
-            movie_date_range = f"{today.strftime('%b %d')} \\- {month_end.strftime('%b %d, %Y')}"
-            
-            msg = f"📅 *Upcoming Releases*\n\n"
-            
-            # TV Episodes section
-            if sonarr_episodes is not None:
-                if sonarr_episodes:
-                    msg += f"*📺 TV Episodes* \\({tv_date_range}\\):\n"
-                    # Sort by air date
-                    sorted_episodes = sorted(sonarr_episodes, 
-                                           key=lambda x: x.get("airDate", "9999-12-31"))
-                    
-                    for episode in sorted_episodes[:10]:  # Limit to 10 episodes
-                        formatted_episode = format_sonarr_episode(episode)
-                        msg += formatted_episode + "\n"
+        # Nothing to fetch if neither service is fully configured
+        sonarr_ready = bool(SONARR_URL and SONARR_API_KEY)
+        radarr_ready = bool(RADARR_URL and RADARR_API_KEY)
+        if not (sonarr_ready or radarr_ready):
+            await send_command_response(update, context, _UPCOMING_NO_SERVICES_MD, parse_mode=ParseMode.MARKDOWN_V2)
+            return
+
+        client = get_http_client()
+        # Keep the placeholder so the final message can replace it instead of being a second send
+        placeholder = await send_command_response(update, context, _UPCOMING_FETCHING_MD, parse_mode=ParseMode.MARKDOWN_V2)
+        
+        # Fetch data from the configured services concurrently (unconfigured ones resolve to no data)
+        sonarr_result, radarr_result = await asyncio.gather(
+            fetch_sonarr_upcoming(client) if sonarr_ready else asyncio.sleep(0, (None, None)),
+            fetch_radarr_upcoming(client) if radarr_ready else asyncio.sleep(0, (None, None)),
+            return_exceptions=True
+        )
+        if isinstance(sonarr_result, Exception):
+            logger.error("❌ Sonarr fetch failed: %s", sonarr_result)
+            sonarr_result = (None, None)
+        if isinstance(radarr_result, Exception):
+            logger.error("❌ Radarr fetch failed: %s", radarr_result)
+            radarr_result = (None, None)
+        sonarr_episodes, sonarr_stale_age = sonarr_result
+        radarr_movies, radarr_stale_age = radarr_result
+        
+        # Build message
+        today = datetime.now(MELBOURNE_TZ).date()
+        tv_date_range, movie_date_range = _date_ranges(today.toordinal())
+        
+        tv_header = _TV_HEADER_TMPL.format(range=tv_date_range)
+        movie_header = _MOVIE_HEADER_TMPL.format(range=movie_date_range)
+        parts = [_UPCOMING_HEADER_MD]
+        
+        # TV Episodes section
+        if sonarr_episodes is not None:
+            if sonarr_episodes:
+                parts.append(tv_header + ":\n")
+                parts.append(stale_note_md(sonarr_stale_age))
+                # Earliest 10 by air date - a partial heap sort, since the rest aren't shown
+                for episode in sonarr_episodes:
+                    episode.setdefault("airDate", _AIRDATE_UNKNOWN)
+                for episode in heapq.nsmallest(10, sonarr_episodes, key=_airdate_key):
+                    formatted_episode = format_sonarr_episode(episode)
+                    parts.append(formatted_episode + "\n")
+                
+                n_eps = len(sonarr_episodes)
+                if n_eps > 10:
+                    parts.append(f"\\.\\.\\. and {n_eps - 10} more episodes\n")
                     
-                    if len(sorted_episodes) > 10:
-                        msg += f"\\.\\.\\. and {len(sorted_episodes) - 10} more episodes\n"
-                        
-                    msg += "\n"
-                else:
-                    msg += f"*📺 TV Episodes* \\({tv_date_range}\\): None scheduled\n\n"
+                parts.append("\n")
             else:
-                if SONARR_URL and SONARR_API_KEY:
-                    msg += f"*📺 TV Episodes* \\({tv_date_range}\\): Data unavailable\n\n"
-            
-            # Movies section
-            if radarr_movies is not None:
-                if radarr_movies:
-                    msg += f"*🎬 Movies* \\({movie_date_range}\\):\n"
-                    # Sort by earliest relevant release date
-                    def get_sort_date(movie):
-                        """Get the earliest upcoming release date for sorting"""
-                        now = datetime.now(MELBOURNE_TZ).date()
-                        dates = []
-                        
-                        for date_str in [movie.get("inCinemas", ""), 
-                                       movie.get("digitalRelease", ""), 
-                                       movie.get("physicalRelease", "")]:
-                            if date_str:
-                                try:
-                                    release_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
-                                    if release_date >= now:  # Future dates only for sorting
-                                        dates.append(release_date)
-                                except:
-                                    continue
-                        
-                        return min(dates) if dates else datetime(9999, 12, 31).date()
-                    
-                    sorted_movies = sorted(radarr_movies, key=get_sort_date)
-                    
-                    # Format movies and filter out None results (movies with no upcoming releases)
-                    formatted_movies = []
-                    for movie in sorted_movies:
-                        formatted_movie = format_radarr_movie(movie)
-                        if formatted_movie is not None:  # Only include movies with upcoming releases
-                            formatted_movies.append(formatted_movie)
+                parts.append(tv_header + ": None scheduled\n")
+                parts.append(stale_note_md(sonarr_stale_age) + "\n")
+        else:
+            if sonarr_ready:
+                parts.append(tv_header + ": Data unavailable\n\n")
+        
+        # Movies section
+        if radarr_movies is not None:
+            if radarr_movies:
+                parts.append(movie_header + ":\n")
+                parts.append(stale_note_md(radarr_stale_age))
+                # Keep only movies with a release in the next month, then take the earliest 15
+                month_end = today + timedelta(days=30)
+                date_cache = {}
+                candidates = [
+                    (sort_date, movie)
+                    for movie in radarr_movies
+                    if (sort_date := get_sort_date(movie, today, date_cache)) is not None and sort_date <= month_end
+                ]
+                
+                if candidates:
+                    for _, movie in heapq.nsmallest(15, candidates, key=itemgetter(0)):  # Show more movies since it's a month
+                        parts.append(format_radarr_movie(movie, today) + "\n")
                     
-                    if formatted_movies:
-                        for formatted_movie in formatted_movies[:15]:  # Show more movies since it's a month
-                            msg += formatted_movie + "\n"
-                        
-                        if len(formatted_movies) > 15:
-                            msg += f"\\.\\.\\. and {len(formatted_movies) - 15} more movies\n"
-                        msg += "\n"
-                    else:
-                        msg += "No upcoming releases this month\n\n"
+                    n_movies = len(candidates)
+                    if n_movies > 15:
+                        parts.append(f"\\.\\.\\. and {n_movies - 15} more movies\n")
+                    parts.append("\n")
                 else:
-                    msg += f"*🎬 Movies* \\({movie_date_range}\\): None scheduled\n\n"
+                    parts.append("No upcoming releases this month\n\n")
             else:
-                if RADARR_URL and RADARR_API_KEY:
-                    msg += f"*🎬 Movies* \\({movie_date_range}\\): Data unavailable\n\n"
-            
-            # Updated Legend
-            msg += "*Legend:*\n"
-            msg += "📁 Downloaded \\| ⏳ Awaiting release\n"
-            msg += "🎬 Cinema \\| 💻 Digital \\| 📀 Physical"
-            
-            # Check if no services configured
-            if not (SONARR_URL or RADARR_URL):
-                msg = "❌ No Sonarr/Radarr configured\\. Check environment variables\\."
-            
-            try:
-                await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
-            except Exception as markdown_error:
-                logger.error("❌ Markdown parsing error in upcoming: %s", markdown_error)
-                # Send as plain text if markdown fails
-                plain_msg = msg.replace("\\", "").replace("*", "").replace("_", "")
-                await send_command_response(update, context, f"📅 Upcoming Releases\n\n{plain_msg}")
-            
+                parts.append(movie_header + ": None scheduled\n")
+                parts.append(stale_note_md(radarr_stale_age) + "\n")
+        else:
+            if radarr_ready:
+                parts.append(movie_header + ": Data unavailable\n\n")
+        
+        # Updated Legend
+        parts.append(_UPCOMING_LEGEND_MD)
+        
+        msg = "".join(parts)
+        
+        try:
+            await _replace_placeholder(update, context, placeholder, msg, parse_mode=ParseMode.MARKDOWN_V2)
+        except BadRequest as markdown_error:
+            # Only entity-parsing failures are worth retrying as plain text
+            if "can't parse" not in str(markdown_error).lower():
+                raise
+            logger.error("❌ Markdown parsing error in upcoming: %s", markdown_error)
+            # Send as plain text if markdown fails
+            plain_msg = msg.translate(_MD_STRIP_TABLE)
+            await _replace_placeholder(update, context, placeholder, f"📅 Upcoming Releases\n\n{plain_msg}")
+        
     except Exception as e:
         logger.error("❌ Error in upcoming command: %s", e)
         await send_command_response(update, context, "❌ Could not fetch upcoming releases\\. Check logs for details\\.", parse_mode=ParseMode.MARKDOWN_V2)
@@ -712,182 +1040,182 @@ async def upcoming_command(update, context: CallbackContext):
 async def queue_command(update, context: CallbackContext):
     """Show current download queue from Radarr and Sonarr"""
     try:
-        async with AsyncClient(timeout=10.0) as client:
-            await send_command_response(update, context, "📥 Fetching download queue\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
+        client = get_http_client()
+        await send_command_response(update, context, "📥 Fetching download queue\\.\\.\\.", parse_mode=ParseMode.MARKDOWN_V2)
 
-            msg = "📥 *Download Queue*\n\n"
-            total_items = 0
+        msg = "📥 *Download Queue*\n\n"
+        total_items = 0
 
-            # Fetch Radarr queue
-            radarr_items = []
-            if RADARR_URL and RADARR_API_KEY:
-                try:
-                    base_url = RADARR_URL.rstrip('/')
-                    headers = {"X-Api-Key": RADARR_API_KEY}
-
-                    # Try API versions
-                    for api_version in ["v3", "v2", "v1"]:
-                        url = f"{base_url}/api/{api_version}/queue"
-                        try:
-                            resp = await client.get(url, headers=headers)
-                            if resp.status_code == 200:
-                                data = resp.json()
-                                radarr_items = data.get("records", [])
-                                logger.info("✅ Fetched %d items from Radarr queue (API %s)", len(radarr_items), api_version)
-                                break
-                        except Exception:
-                            continue
-                except Exception as e:
-                    logger.error("❌ Failed to fetch Radarr queue: %s", e)
+        # Fetch Radarr queue
+        radarr_items = []
+        if RADARR_URL and RADARR_API_KEY:
+            try:
+                base_url = RADARR_URL.rstrip('/')
+                headers = {"X-Api-Key": RADARR_API_KEY}
+
+                # Try API versions
+                for api_version in ["v3", "v2", "v1"]:
+                    url = f"{base_url}/api/{api_version}/queue"
+                    try:
+                        resp = await client.get(url, headers=headers)
+                        if resp.status_code == 200:
+                            data = resp.json()
+                            radarr_items = data.get("records", [])
+                            logger.info("✅ Fetched %d items from Radarr queue (API %s)", len(radarr_items), api_version)
+                            break
+                    except Exception:
+                        continue
+            except Exception as e:
+                logger.error("❌ Failed to fetch Radarr queue: %s", e)
 
-            # Fetch Sonarr queue
-            sonarr_items = []
-            if SONARR_URL and SONARR_API_KEY:
-                try:
-                    base_url = SONARR_URL.rstrip('/')
-                    headers = {"X-Api-Key": SONARR_API_KEY}
-
-                    # Try API versions
-                    for api_version in ["v3", "v2", "v1"]:
-                        url = f"{base_url}/api/{api_version}/queue"
-                        try:
-                            resp = await client.get(url, headers=headers)
-                            if resp.status_code == 200:
-                                data = resp.json()
-                                sonarr_items = data.get("records", [])
-                                logger.info("✅ Fetched %d items from Sonarr queue (API %s)", len(sonarr_items), api_version)
-                                break
-                        except Exception:
-                            continue
-                except Exception as e:
-                    logger.error("❌ Failed to fetch Sonarr queue: %s", e)
-
-            # Format Radarr items (Movies)
-            if radarr_items:
-                msg += "*🎬 Movies:*\n"
-                for item in radarr_items[:10]:  # Limit to 10
-                    title = escape_md(item.get("title", "Unknown"))
-                    status = item.get("status", "unknown").lower()
-
-                    # Get progress info
-                    size_left = item.get("sizeleft", 0)
-                    size_total = item.get("size", 1)
-                    progress = ((size_total - size_left) / size_total * 100) if size_total > 0 else 0
-
-                    # Get status details
-                    status_messages = item.get("statusMessages", [])
-                    error_msg = ""
-                    if status_messages:
-                        for msg_obj in status_messages:
-                            messages = msg_obj.get("messages", [])
-                            if messages:
-                                error_msg = escape_md(f" - {messages[0][:50]}")
-
-                    # Format status emoji
-                    if status == "downloading":
-                        status_emoji = "⬇️"
-                        status_text = f"{progress:.0f}%"
-                    elif status == "queued":
-                        status_emoji = "⏳"
-                        status_text = "Queued"
-                    elif status == "paused":
-                        status_emoji = "⏸️"
-                        status_text = "Paused"
-                    elif status == "warning":
-                        status_emoji = "⚠️"
-                        status_text = "Warning"
-                    elif status == "failed":
-                        status_emoji = "❌"
-                        status_text = "Failed"
-                    else:
-                        status_emoji = "📦"
-                        status_text = escape_md(status.title())
-
-                    msg += f"{status_emoji} {title} – {escape_md(status_text)}{error_msg}\n"
-                    total_items += 1
-
-                if len(radarr_items) > 10:
-                    msg += f"\\.\\.\\. and {len(radarr_items) - 10} more movies\n"
-                msg += "\n"
-            elif RADARR_URL and RADARR_API_KEY:
-                msg += "*🎬 Movies:* Queue empty\n\n"
-
-            # Format Sonarr items (TV Shows)
-            if sonarr_items:
-                msg += "*📺 TV Shows:*\n"
-                for item in sonarr_items[:10]:  # Limit to 10
-                    series_title = item.get("series", {}).get("title", "Unknown")
-                    episode = item.get("episode", {})
-                    season_num = episode.get("seasonNumber", 0)
-                    episode_num = episode.get("episodeNumber", 0)
-                    episode_title = episode.get("title", "")
-
-                    full_title = f"{series_title} S{season_num:02d}E{episode_num:02d}"
-                    if episode_title:
-                        full_title += f" - {episode_title}"
-                    full_title = escape_md(full_title)
-
-                    status = item.get("status", "unknown").lower()
-
-                    # Get progress info
-                    size_left = item.get("sizeleft", 0)
-                    size_total = item.get("size", 1)
-                    progress = ((size_total - size_left) / size_total * 100) if size_total > 0 else 0
-
-                    # Get status details
-                    status_messages = item.get("statusMessages", [])
-                    error_msg = ""
-                    if status_messages:
-                        for msg_obj in status_messages:
-                            messages = msg_obj.get("messages", [])
-                            if messages:
-                                error_msg = escape_md(f" - {messages[0][:50]}")
-
-                    # Format status emoji
-                    if status == "downloading":
-                        status_emoji = "⬇️"
-                        status_text = f"{progress:.0f}%"
-                    elif status == "queued":
-                        status_emoji = "⏳"
-                        status_text = "Queued"
-                    elif status == "paused":
-                        status_emoji = "⏸️"
-                        status_text = "Paused"
-                    elif status == "warning":
-                        status_emoji = "⚠️"
-                        status_text = "Warning"
-                    elif status == "failed":
-                        status_emoji = "❌"
-                        status_text = "Failed"
-                    else:
-                        status_emoji = "📦"
-                        status_text = escape_md(status.title())
+        # Fetch Sonarr queue
+        sonarr_items = []
+        if SONARR_URL and SONARR_API_KEY:
+            try:
+                base_url = SONARR_URL.rstrip('/')
+                headers = {"X-Api-Key": SONARR_API_KEY}
+
+                # Try API versions
+                for api_version in ["v3", "v2", "v1"]:
+                    url = f"{base_url}/api/{api_version}/queue"
+                    try:
+                        resp = await client.get(url, headers=headers)
+                        if resp.status_code == 200:
+                            data = resp.json()
+                            sonarr_items = data.get("records", [])
+                            logger.info("✅ Fetched %d items from Sonarr queue (API %s)", len(sonarr_items), api_version)
+                            break
+                    except Exception:
+                        continue
+            except Exception as e:
+                logger.error("❌ Failed to fetch Sonarr queue: %s", e)
+
+        # Format Radarr items (Movies)
+        if radarr_items:
+            msg += "*🎬 Movies:*\n"
+            for item in radarr_items[:10]:  # Limit to 10
+                title = escape_md(item.get("title", "Unknown"))
+                status = item.get("status", "unknown").lower()
+
+                # Get progress info
+                size_left = item.get("sizeleft", 0)
+                size_total = item.get("size", 1)
+                progress = ((size_total - size_left) / size_total * 100) if size_total > 0 else 0
+
+                # Get status details
+                status_messages = item.get("statusMessages", [])
+                error_msg = ""
+                if status_messages:
+                    for msg_obj in status_messages:
+                        messages = msg_obj.get("messages", [])
+                        if messages:
+                            error_msg = escape_md(f" - {messages[0][:50]}")
+
+                # Format status emoji
+                if status == "downloading":
+                    status_emoji = "⬇️"
+                    status_text = f"{progress:.0f}%"
+                elif status == "queued":
+                    status_emoji = "⏳"
+                    status_text = "Queued"
+                elif status == "paused":
+                    status_emoji = "⏸️"
+                    status_text = "Paused"
+                elif status == "warning":
+                    status_emoji = "⚠️"
+                    status_text = "Warning"
+                elif status == "failed":
+                    status_emoji = "❌"
+                    status_text = "Failed"
+                else:
+                    status_emoji = "📦"
+                    status_text = escape_md(status.title())
+
+                msg += f"{status_emoji} {title} – {escape_md(status_text)}{error_msg}\n"
+                total_items += 1
+
+            if len(radarr_items) > 10:
+                msg += f"\\.\\.\\. and {len(radarr_items) - 10} more movies\n"
+            msg += "\n"
+        elif RADARR_URL and RADARR_API_KEY:
+            msg += "*🎬 Movies:* Queue empty\n\n"
+
+        # Format Sonarr items (TV Shows)
+        if sonarr_items:
+            msg += "*📺 TV Shows:*\n"
+            for item in sonarr_items[:10]:  # Limit to 10
+                series_title = item.get("series", {}).get("title", "Unknown")
+                episode = item.get("episode", {})
+                season_num = episode.get("seasonNumber", 0)
+                episode_num = episode.get("episodeNumber", 0)
+                episode_title = episode.get("title", "")
+
+                full_title = f"{series_title} S{season_num:02d}E{episode_num:02d}"
+                if episode_title:
+                    full_title += f" - {episode_title}"
+                full_title = escape_md(full_title)
+
+                status = item.get("status", "unknown").lower()
+
+                # Get progress info
+                size_left = item.get("sizeleft", 0)
+                size_total = item.get("size", 1)
+                progress = ((size_total - size_left) / size_total * 100) if size_total > 0 else 0
+
+                # Get status details
+                status_messages = item.get("statusMessages", [])
+                error_msg = ""
+                if status_messages:
+                    for msg_obj in status_messages:
+                        messages = msg_obj.get("messages", [])
+                        if messages:
+                            error_msg = escape_md(f" - {messages[0][:50]}")
+
+                # Format status emoji
+                if status == "downloading":
+                    status_emoji = "⬇️"
+                    status_text = f"{progress:.0f}%"
+                elif status == "queued":
+                    status_emoji = "⏳"
+                    status_text = "Queued"
+                elif status == "paused":
+                    status_emoji = "⏸️"
+                    status_text = "Paused"
+                elif status == "warning":
+                    status_emoji = "⚠️"
+                    status_text = "Warning"
+                elif status == "failed":
+                    status_emoji = "❌"
+                    status_text = "Failed"
+                else:
+                    status_emoji = "📦"
+                    status_text = escape_md(status.title())
 
-                    msg += f"{status_emoji} {full_title} – {escape_md(status_text)}{error_msg}\n"
-                    total_items += 1
+                msg += f"{status_emoji} {full_title} – {escape_md(status_text)}{error_msg}\n"
+                total_items += 1
 
-                if len(sonarr_items) > 10:
-                    msg += f"\\.\\.\\. and {len(sonarr_items) - 10} more episodes\n"
-                msg += "\n"
-            elif SONARR_URL and SONARR_API_KEY:
-                msg += "*📺 TV Shows:* Queue empty\n\n"
+            if len(sonarr_items) > 10:
+                msg += f"\\.\\.\\. and {len(sonarr_items) - 10} more episodes\n"
+            msg += "\n"
+        elif SONARR_URL and SONARR_API_KEY:
+            msg += "*📺 TV Shows:* Queue empty\n\n"
 
-            # Summary
-            if total_items == 0:
-                msg += "✅ No active downloads"
-            else:
-                msg += f"*Total:* {total_items} item{'s' if total_items != 1 else ''} in queue"
+        # Summary
+        if total_items == 0:
+            msg += "✅ No active downloads"
+        else:
+            msg += f"*Total:* {total_items} item{'s' if total_items != 1 else ''} in queue"
 
-            # Check if no services configured
-            if not (RADARR_URL or SONARR_URL):
-                msg = "❌ No Radarr/Sonarr configured\\. Check environment variables\\."
+        # Check if no services configured
+        if not (RADARR_URL or SONARR_URL):
+            msg = "❌ No Radarr/Sonarr configured\\. Check environment variables\\."
 
-            try:
-                await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
-            except Exception as markdown_error:
-                logger.error("❌ Markdown parsing error in queue: %s", markdown_error)
-                plain_msg = msg.replace("\\", "").replace("*", "").replace("_", "")
-                await send_command_response(update, context, f"📥 Download Queue\n\n{plain_msg}")
+        try:
+            await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
+        except Exception as markdown_error:
+            logger.error("❌ Markdown parsing error in queue: %s", markdown_error)
+            plain_msg = msg.translate(_MD_STRIP_TABLE)
+            await send_command_response(update, context, f"📥 Download Queue\n\n{plain_msg}")
 
     except Exception as e:
         logger.error("❌ Error in queue command: %s", e)
@@ -928,110 +1256,110 @@ async def search_plex_command(update, context: CallbackContext):
         # Search Plex via Tautulli
         base_url = TAUTILLI_URL.rstrip('/')
 
-        async with AsyncClient(timeout=15.0) as client:
-            params = {
-                "apikey": TAUTILLI_API_KEY,
-                "cmd": "search",
-                "query": query,
-                "limit": 25
-            }
-
-            resp = await client.get(f"{base_url}/api/v2", params=params)
-
-            if resp.status_code != 200:
-                await send_command_response(
-                    update, context,
-                    "❌ Failed to search Plex library\\.",
-                    parse_mode=ParseMode.MARKDOWN_V2
-                )
-                return
+        client = get_http_client()
+        params = {
+            "apikey": TAUTILLI_API_KEY,
+            "cmd": "search",
+            "query": query,
+            "limit": 25
+        }
 
-            result = resp.json()
+        resp = await client.get(f"{base_url}/api/v2", params=params, timeout=15.0)
 
-            if result.get("response", {}).get("result") != "success":
-                await send_command_response(
-                    update, context,
-                    "❌ Plex search failed\\.",
-                    parse_mode=ParseMode.MARKDOWN_V2
-                )
-                return
-
-            # Get search results - handle various response formats
-            data = result.get("response", {}).get("data", {})
-
-            results_list = []
-            if isinstance(data, dict):
-                results_list = data.get("results_list", [])
-                if not results_list and "results" in data:
-                    results_list = data.get("results", [])
-            elif isinstance(data, list):
-                results_list = data
-
-            if not results_list:
-                await send_command_response(
-                    update, context,
-                    f"❌ No results found for: *{escape_md(query)}*\n\n"
-                    f"_Try `/movie {escape_md(query)}` or `/tv {escape_md(query)}` to request it\\._",
-                    parse_mode=ParseMode.MARKDOWN_V2
-                )
-                return
-
-            # Group results by media type
-            movies = []
-            shows = []
-            other = []
-
-            for item in results_list:
-                # Skip if item is not a dictionary (could be string in some responses)
-                if not isinstance(item, dict):
-                    logger.debug("Skipping non-dict search result: %s", type(item))
-                    continue
-                media_type = item.get("media_type", "").lower()
-                if media_type == "movie":
-                    movies.append(item)
-                elif media_type in ["show", "season", "episode"]:
-                    # Only add shows, skip seasons/episodes to avoid duplicates
-                    if media_type == "show":
-                        shows.append(item)
-                else:
-                    other.append(item)
-
-            # Build message
-            msg = f"🔍 *Plex Search Results for:* {escape_md(query)}\n\n"
-
-            if movies:
-                msg += f"*🎬 Movies \\({len(movies)}\\):*\n"
-                for movie in movies[:8]:
-                    title = escape_md(movie.get("title", "Unknown"))
-                    year = movie.get("year", "")
-                    year_str = f" \\({year}\\)" if year else ""
-                    msg += f"• {title}{year_str}\n"
-                if len(movies) > 8:
-                    msg += f"  _\\.\\.\\. and {len(movies) - 8} more_\n"
-                msg += "\n"
-
-            if shows:
-                msg += f"*📺 TV Shows \\({len(shows)}\\):*\n"
-                for show in shows[:8]:
-                    title = escape_md(show.get("title", "Unknown"))
-                    year = show.get("year", "")
-                    year_str = f" \\({year}\\)" if year else ""
-                    msg += f"• {title}{year_str}\n"
-                if len(shows) > 8:
-                    msg += f"  _\\.\\.\\. and {len(shows) - 8} more_\n"
-                msg += "\n"
-
-            if not movies and not shows and other:
-                msg += f"*Other Results \\({len(other)}\\):*\n"
-                for item in other[:5]:
-                    title = escape_md(item.get("title", "Unknown"))
-                    msg += f"• {title}\n"
-                msg += "\n"
-
-            total = len(movies) + len(shows)
-            msg += f"✅ Found {total} result{'s' if total != 1 else ''} on Plex"
+        if resp.status_code != 200:
+            await send_command_response(
+                update, context,
+                "❌ Failed to search Plex library\\.",
+                parse_mode=ParseMode.MARKDOWN_V2
+            )
+            return
 
-            await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
+        result = resp.json()
+
+        if result.get("response", {}).get("result") != "success":
+            await send_command_response(
+                update, context,
+                "❌ Plex search failed\\.",
+                parse_mode=ParseMode.MARKDOWN_V2
+            )
+            return
+
+        # Get search results - handle various response formats
+        data = result.get("response", {}).get("data", {})
+
+        results_list = []
+        if isinstance(data, dict):
+            results_list = data.get("results_list", [])
+            if not results_list and "results" in data:
+                results_list = data.get("results", [])
+        elif isinstance(data, list):
+            results_list = data
+
+        if not results_list:
+            await send_command_response(
+                update, context,
+                f"❌ No results found for: *{escape_md(query)}*\n\n"
+                f"_Try `/movie {escape_md(query)}` or `/tv {escape_md(query)}` to request it\\._",
+                parse_mode=ParseMode.MARKDOWN_V2
+            )
+            return
+
+        # Group results by media type
+        movies = []
+        shows = []
+        other = []
+
+        for item in results_list:
+            # Skip if item is not a dictionary (could be string in some responses)
+            if not isinstance(item, dict):
+                logger.debug("Skipping non-dict search result: %s", type(item))
+                continue
+            media_type = item.get("media_type", "").lower()
+            if media_type == "movie":
+                movies.append(item)
+            elif media_type in ["show", "season", "episode"]:
+                # Only add shows, skip seasons/episodes to avoid duplicates
+                if media_type == "show":
+                    shows.append(item)
+            else:
+                other.append(item)
+
+        # Build message
+        msg = f"🔍 *Plex Search Results for:* {escape_md(query)}\n\n"
+
+        if movies:
+            msg += f"*🎬 Movies \\({len(movies)}\\):*\n"
+            for movie in movies[:8]:
+                title = escape_md(movie.get("title", "Unknown"))
+                year = movie.get("year", "")
+                year_str = f" \\({year}\\)" if year else ""
+                msg += f"• {title}{year_str}\n"
+            if len(movies) > 8:
+                msg += f"  _\\.\\.\\. and {len(movies) - 8} more_\n"
+            msg += "\n"
+
+        if shows:
+            msg += f"*📺 TV Shows \\({len(shows)}\\):*\n"
+            for show in shows[:8]:
+                title = escape_md(show.get("title", "Unknown"))
+                year = show.get("year", "")
+                year_str = f" \\({year}\\)" if year else ""
+                msg += f"• {title}{year_str}\n"
+            if len(shows) > 8:
+                msg += f"  _\\.\\.\\. and {len(shows) - 8} more_\n"
+            msg += "\n"
+
+        if not movies and not shows and other:
+            msg += f"*Other Results \\({len(other)}\\):*\n"
+            for item in other[:5]:
+                title = escape_md(item.get("title", "Unknown"))
+                msg += f"• {title}\n"
+            msg += "\n"
+
+        total = len(movies) + len(shows)
+        msg += f"✅ Found {total} result{'s' if total != 1 else ''} on Plex"
+
+        await send_command_response(update, context, msg, parse_mode=ParseMode.MARKDOWN_V2)
 
     except Exception as e:
         logger.error("❌ Plex search command failed: %s", e)
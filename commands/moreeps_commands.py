@@ -3,40 +3,230 @@ More Episodes command
 Allows users to add more seasons/episodes to TV shows already in Sonarr
 """
 
+import asyncio
+import itertools
 import logging
-from datetime import datetime
+import time
+from collections import OrderedDict, defaultdict
+from operator import itemgetter
 from telegram.ext import CallbackContext
 from telegram.constants import ParseMode
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from httpx import AsyncClient
 
 from config import SONARR_URL, SONARR_API_KEY, SILENT_NOTIFICATIONS, GROUP_CHAT_ID, BOT_TOPIC_ID
 from utils.helpers import send_command_response, escape_md
+from utils.http_client import get_http_client, decode_json
 
 logger = logging.getLogger(__name__)
 
-# Store active moreeps sessions
-moreeps_sessions = {}
+# Sessions idle longer than this are dropped, and at most this many are kept (least recently used go first)
+MOREEPS_SESSION_TTL = 1800
+MOREEPS_MAX_SESSIONS = 1024
 
+# Episode fields the moreeps handlers read; everything else Sonarr returns is dropped from sessions
+_SESSION_EPISODE_FIELDS = ("id", "seasonNumber", "episodeNumber", "title", "monitored", "hasFile")
 
-async def get_sonarr_api_version():
-    """Detect working Sonarr API version"""
-    if not (SONARR_URL and SONARR_API_KEY):
-        return None
 
-    base_url = SONARR_URL.rstrip('/')
-    headers = {"X-Api-Key": SONARR_API_KEY}
+class SessionStore:
+    """Bounded LRU of moreeps sessions that expire after MOREEPS_SESSION_TTL idle seconds"""
+
+    def __init__(self, maxsize=MOREEPS_MAX_SESSIONS, ttl=MOREEPS_SESSION_TTL):
+        self._data = OrderedDict()
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def _purge(self):
+        # Entries are kept in last-used order, so expired ones are always at the front
+        cutoff = time.monotonic() - self.ttl
+        while self._data and next(iter(self._data.values()))[0] < cutoff:
+            self._data.popitem(last=False)
+
+    def __setitem__(self, key, value):
+        self._purge()
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        self._purge()
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        # Touching a session keeps it alive
+        self._data[key] = (time.monotonic(), entry[1])
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def __len__(self):
+        return len(self._data)
+
+
+def slim_episodes(episodes):
+    """Keep only the episode fields moreeps sessions use"""
+    return [{k: ep[k] for k in _SESSION_EPISODE_FIELDS if k in ep} for ep in episodes]
+
+
+def sorted_regular_seasons(series_data):
+    """Slim copies of a Sonarr series' seasons, without specials (season 0), ordered by season number"""
+    seasons = [
+        {"seasonNumber": season.get("seasonNumber", 0), "monitored": season.get("monitored", False)}
+        for season in series_data.get("seasons", [])
+        if season.get("seasonNumber", 0) > 0
+    ]
+    seasons.sort(key=itemgetter("seasonNumber"))
+    return seasons
+
+
+def set_session_episodes(session, episodes):
+    """Store a series' episodes in a session, grouped by season with per-season counts
+
+    season_stats maps season number to (total, monitored, downloaded).
+    """
+    # One pass groups the episodes and tallies [total, monitored, downloaded] per season
+    by_season = defaultdict(list)
+    counts = defaultdict(lambda: [0, 0, 0])
+    # Sorting first leaves every season's list in episode order
+    for ep in sorted(slim_episodes(episodes), key=lambda e: e.get("episodeNumber", 0)):
+        sn = ep.get("seasonNumber", 0)
+        by_season[sn].append(ep)
+        tally = counts[sn]
+        tally[0] += 1
+        tally[1] += bool(ep.get("monitored", False))
+        tally[2] += bool(ep.get("hasFile", False))
+    season_stats = {sn: tuple(tally) for sn, tally in counts.items()}
+
+    session["episodes"] = [ep for season_episodes in by_season.values() for ep in season_episodes]
+    session["by_season"] = dict(by_season)
+    session["season_stats"] = season_stats
+
+
+# Store active moreeps sessions, keyed by a short integer so callback payloads stay compact
+moreeps_sessions = SessionStore()
+# Seeded from the clock so buttons left over from before a restart don't hit new sessions
+_session_ids = itertools.count(int(time.time()))
+
+# Prefix shared by every moreeps callback payload (see build_callback_data)
+CALLBACK_PATTERN = r"^m[A-Za-z]\|"
+
+
+def new_session_id() -> int:
+    """Allocate an ID for a new moreeps session"""
+    return next(_session_ids)
+
+
+def build_callback_data(op: str, session_id: int, arg="") -> str:
+    """Build a compact callback payload: m{op}|{session_id}|{arg}"""
+    return f"m{op}|{session_id}|{arg}"
+
+
+# Sonarr API version detected on first use, so helpers don't re-probe v3/v2/v1 on every call
+_sonarr_api_version = None
+_sonarr_api_version_lock = asyncio.Lock()
+
+SONARR_OFFLINE_MSG = "Server is offline. Please use /on to wake it up, then try again."
+
 
-    async with AsyncClient(timeout=10.0) as client:
+async def _get_api_version(client, refresh: bool = False):
+    """Return the cached Sonarr API version, detecting it via /system/status if needed"""
+    global _sonarr_api_version
+    if _sonarr_api_version and not refresh:
+        return _sonarr_api_version
+
+    async with _sonarr_api_version_lock:
+        # Another caller may have detected it while we waited
+        if _sonarr_api_version and not refresh:
+            return _sonarr_api_version
+
+        _sonarr_api_version = None
+        base_url = SONARR_URL.rstrip('/')
+        headers = {"X-Api-Key": SONARR_API_KEY}
         for api_version in ["v3", "v2", "v1"]:
             try:
                 url = f"{base_url}/api/{api_version}/system/status"
                 resp = await client.get(url, headers=headers)
                 if resp.status_code == 200:
-                    return api_version
+                    logger.info("✅ Sonarr API version detected: %s", api_version)
+                    _sonarr_api_version = api_version
+                    break
             except Exception:
                 continue
-    return None
+    return _sonarr_api_version
+
+
+async def _sonarr_request(client, method: str, path: str, **kwargs):
+    """Send a request to Sonarr on the cached API version
+
+    Re-detects the version once if the request 404s. Returns None when Sonarr can't be reached.
+    """
+    global _sonarr_api_version
+    base_url = SONARR_URL.rstrip('/')
+    headers = {"X-Api-Key": SONARR_API_KEY}
+
+    try:
+        api_version = await _get_api_version(client)
+        if api_version is None:
+            return None
+        resp = await client.request(method, f"{base_url}/api/{api_version}{path}", headers=headers, **kwargs)
+        if resp.status_code == 404:
+            # Sonarr may have been upgraded - retry only if the detected version changed
+            new_version = await _get_api_version(client, refresh=True)
+            if new_version and new_version != api_version:
+                resp = await client.request(method, f"{base_url}/api/{new_version}{path}", headers=headers, **kwargs)
+        return resp
+    except Exception as e:
+        # Connection failures usually mean the server is down; detect again next time
+        logger.debug("Sonarr request %s %s failed: %s", method, path, e)
+        _sonarr_api_version = None
+        return None
+
+
+async def get_sonarr_api_version():
+    """Detect working Sonarr API version"""
+    if not (SONARR_URL and SONARR_API_KEY):
+        return None
+
+    client = get_http_client()
+    return await _get_api_version(client)
+
+
+# Sonarr library with a casefolded title index, refreshed every SERIES_CACHE_TTL seconds
+SERIES_CACHE_TTL = 300
+_series_cache = {"data": None, "folded_titles": [], "exact": {}, "expires": 0.0}
+
+
+def invalidate_library_cache():
+    """Drop the cached Sonarr library so the next /moreeps refetches it"""
+    _series_cache["data"] = None
+    _series_cache["expires"] = 0.0
+
+
+async def _get_series_index():
+    """Return the cached library index, fetching /series on a miss. Returns (cache, error)"""
+    if _series_cache["data"] is not None and time.monotonic() < _series_cache["expires"]:
+        return _series_cache, None
+
+    client = get_http_client()
+    resp = await _sonarr_request(client, "GET", "/series")
+    if resp is None or resp.status_code != 200:
+        invalidate_library_cache()
+        return None, SONARR_OFFLINE_MSG
+    all_series = decode_json(resp)
+
+    # Casefold every title once per refresh (handles e.g. German ß, unlike lower())
+    folded_titles = [(series.get("title", "").casefold(), series) for series in all_series]
+    exact = {}
+    for title, series in folded_titles:
+        exact.setdefault(title, []).append(series)
+
+    _series_cache.update(data=all_series, folded_titles=folded_titles, exact=exact,
+                         expires=time.monotonic() + SERIES_CACHE_TTL)
+    logger.info("📚 Cached %d Sonarr series for /moreeps", len(all_series))
+    return _series_cache, None
 
 
 async def search_sonarr_series(query: str):
@@ -45,35 +235,22 @@ async def search_sonarr_series(query: str):
         return None, "Sonarr not configured"
 
     try:
-        base_url = SONARR_URL.rstrip('/')
-        headers = {"X-Api-Key": SONARR_API_KEY}
+        index, error = await _get_series_index()
+        if error:
+            return None, error
+
+        # Search by title (case-insensitive partial match): exact, then prefix, then substring hits
+        query_folded = query.casefold().strip()
+        matches = list(index["exact"].get(query_folded, ()))
+        substring_matches = []
+        for title, series in index["folded_titles"]:
+            pos = title.find(query_folded)  # one C-level scan gives both "contains" and "startswith"
+            if pos < 0 or title == query_folded:
+                continue
+            (matches if pos == 0 else substring_matches).append(series)
+        matches.extend(substring_matches)
 
-        async with AsyncClient(timeout=10.0) as client:
-            for api_version in ["v3", "v2", "v1"]:
-                try:
-                    url = f"{base_url}/api/{api_version}/series"
-                    resp = await client.get(url, headers=headers)
-                    if resp.status_code == 200:
-                        all_series = resp.json()
-
-                        # Search by title (case-insensitive partial match)
-                        query_lower = query.lower().strip()
-                        matches = []
-                        for series in all_series:
-                            title = series.get("title", "").lower()
-                            # Exact match gets priority
-                            if title == query_lower:
-                                matches.insert(0, series)
-                            elif query_lower in title:
-                                matches.append(series)
-
-                        return matches, None
-                    elif resp.status_code == 404:
-                        continue
-                except Exception:
-                    continue
-
-            return None, "Server is offline. Please use /on to wake it up, then try again."
+        return matches, None
 
     except Exception as e:
         logger.error("Failed to search Sonarr series: %s", e)
@@ -86,22 +263,11 @@ async def get_sonarr_series_details(sonarr_id: int):
         return None, "Sonarr not configured"
 
     try:
-        base_url = SONARR_URL.rstrip('/')
-        headers = {"X-Api-Key": SONARR_API_KEY}
-
-        async with AsyncClient(timeout=10.0) as client:
-            for api_version in ["v3", "v2", "v1"]:
-                try:
-                    url = f"{base_url}/api/{api_version}/series/{sonarr_id}"
-                    resp = await client.get(url, headers=headers)
-                    if resp.status_code == 200:
-                        return resp.json(), None
-                    elif resp.status_code == 404:
-                        continue
-                except Exception:
-                    continue
-
-            return None, "Server is offline. Please use /on to wake it up, then try again."
+        client = get_http_client()
+        resp = await _sonarr_request(client, "GET", f"/series/{sonarr_id}")
+        if resp is None or resp.status_code != 200:
+            return None, SONARR_OFFLINE_MSG
+        return decode_json(resp), None
 
     except Exception as e:
         logger.error("Failed to get series details: %s", e)
@@ -114,22 +280,11 @@ async def get_sonarr_episodes(sonarr_id: int):
         return None, "Sonarr not configured"
 
     try:
-        base_url = SONARR_URL.rstrip('/')
-        headers = {"X-Api-Key": SONARR_API_KEY}
-
-        async with AsyncClient(timeout=10.0) as client:
-            for api_version in ["v3", "v2", "v1"]:
-                try:
-                    url = f"{base_url}/api/{api_version}/episode?seriesId={sonarr_id}"
-                    resp = await client.get(url, headers=headers)
-                    if resp.status_code == 200:
-                        return resp.json(), None
-                    elif resp.status_code == 404:
-                        continue
-                except Exception:
-                    continue
-
-            return None, "Server is offline. Please use /on to wake it up, then try again."
+        client = get_http_client()
+        resp = await _sonarr_request(client, "GET", "/episode", params={"seriesId": sonarr_id})
+        if resp is None or resp.status_code != 200:
+            return None, SONARR_OFFLINE_MSG
+        return decode_json(resp), None
 
     except Exception as e:
         logger.error("Failed to get episodes: %s", e)
@@ -142,31 +297,19 @@ async def set_episode_monitoring(episode_ids: list, monitored: bool = True):
         return False, "Sonarr not configured"
 
     try:
-        base_url = SONARR_URL.rstrip('/')
-        headers = {"X-Api-Key": SONARR_API_KEY, "Content-Type": "application/json"}
-
-        async with AsyncClient(timeout=10.0) as client:
-            for api_version in ["v3", "v2", "v1"]:
-                try:
-                    url = f"{base_url}/api/{api_version}/episode/monitor"
-                    data = {
-                        "episodeIds": episode_ids,
-                        "monitored": monitored
-                    }
-                    resp = await client.put(url, headers=headers, json=data)
-                    if resp.status_code in [200, 202]:
-                        logger.info("Set monitoring for %d episodes to %s", len(episode_ids), monitored)
-                        return True, None
-                    elif resp.status_code == 404:
-                        continue
-                    else:
-                        logger.error("Sonarr episode monitor API %s returned %d: %s",
-                                    api_version, resp.status_code, resp.text)
-                        continue
-                except Exception:
-                    continue
-
-            return False, "Server is offline. Please use /on to wake it up, then try again."
+        client = get_http_client()
+        data = {
+            "episodeIds": episode_ids,
+            "monitored": monitored
+        }
+        resp = await _sonarr_request(client, "PUT", "/episode/monitor", json=data)
+        if resp is None:
+            return False, SONARR_OFFLINE_MSG
+        if resp.status_code in [200, 202]:
+            logger.info("Set monitoring for %d episodes to %s", len(episode_ids), monitored)
+            return True, None
+        logger.error("Sonarr episode monitor API returned %d: %s", resp.status_code, resp.text)
+        return False, SONARR_OFFLINE_MSG
 
     except Exception as e:
         logger.error("Failed to set episode monitoring: %s", e)
@@ -179,37 +322,38 @@ async def trigger_episode_search(episode_ids: list):
         return False, "Sonarr not configured"
 
     try:
-        base_url = SONARR_URL.rstrip('/')
-        headers = {"X-Api-Key": SONARR_API_KEY, "Content-Type": "application/json"}
-
-        async with AsyncClient(timeout=10.0) as client:
-            for api_version in ["v3", "v2", "v1"]:
-                try:
-                    url = f"{base_url}/api/{api_version}/command"
-                    data = {
-                        "name": "EpisodeSearch",
-                        "episodeIds": episode_ids
-                    }
-                    resp = await client.post(url, headers=headers, json=data)
-                    if resp.status_code in [200, 201]:
-                        logger.info("Triggered search for %d episodes", len(episode_ids))
-                        return True, None
-                    elif resp.status_code == 404:
-                        continue
-                    else:
-                        logger.error("Sonarr command API %s returned %d: %s",
-                                    api_version, resp.status_code, resp.text)
-                        continue
-                except Exception:
-                    continue
-
-            return False, "Server is offline. Please use /on to wake it up, then try again."
+        client = get_http_client()
+        data = {
+            "name": "EpisodeSearch",
+            "episodeIds": episode_ids
+        }
+        resp = await _sonarr_request(client, "POST", "/command", json=data)
+        if resp is None:
+            return False, SONARR_OFFLINE_MSG
+        if resp.status_code in [200, 201]:
+            logger.info("Triggered search for %d episodes", len(episode_ids))
+            return True, None
+        logger.error("Sonarr command API returned %d: %s", resp.status_code, resp.text)
+        return False, SONARR_OFFLINE_MSG
 
     except Exception as e:
         logger.error("Failed to trigger episode search: %s", e)
         return False, str(e)
 
 
+async def monitor_and_search(episode_ids: list, search_ids: list):
+    """Monitor episodes, then trigger a search for search_ids if monitoring succeeded
+
+    Returns (success, error, search_success) where success/error describe the monitoring call.
+    """
+    success, error = await set_episode_monitoring(episode_ids, True)
+    if not success or not search_ids:
+        return success, error, False
+
+    search_success, _ = await trigger_episode_search(search_ids)
+    return success, error, search_success
+
+
 async def moreeps_command(update, context: CallbackContext):
     """Search Sonarr library for a TV show to add more episodes"""
     if not (SONARR_URL and SONARR_API_KEY):
@@ -269,7 +413,7 @@ async def moreeps_command(update, context: CallbackContext):
             return
 
         # Multiple matches - let user pick
-        session_id = f"moreeps_{user_id}_{int(datetime.now().timestamp())}"
+        session_id = new_session_id()
         moreeps_sessions[session_id] = {
             "user_id": user_id,
             "matches": matches
@@ -289,12 +433,12 @@ async def moreeps_command(update, context: CallbackContext):
 
             keyboard.append([InlineKeyboardButton(
                 button_text,
-                callback_data=f"moreeps_pick_{session_id}_{i}"
+                callback_data=build_callback_data("p", session_id, i)
             )])
 
         keyboard.append([InlineKeyboardButton(
             "❌ Cancel",
-            callback_data=f"moreeps_cancel_{session_id}"
+            callback_data=build_callback_data("c", session_id)
         )])
 
         # Send to bot topic with reply markup
@@ -329,8 +473,15 @@ async def show_series_seasons(update, context_or_query, series, user_id):
     sonarr_id = series.get("id")
     title = series.get("title", "Unknown")
 
-    # Get full series details with seasons
-    series_data, error = await get_sonarr_series_details(sonarr_id)
+    # Series details (with seasons) and its episodes are independent, so fetch them together
+    series_result, episode_result = await asyncio.gather(
+        get_sonarr_series_details(sonarr_id), get_sonarr_episodes(sonarr_id), return_exceptions=True
+    )
+    if isinstance(series_result, Exception):
+        series_result = (None, str(series_result))
+    if isinstance(episode_result, Exception):
+        episode_result = (None, str(episode_result))
+    series_data, error = series_result
     if error:
         msg = f"❌ Failed to get series details: {escape_md(error)}"
         if hasattr(context_or_query, 'edit_message_text'):
@@ -339,15 +490,13 @@ async def show_series_seasons(update, context_or_query, series, user_id):
             await send_command_response(update, context_or_query, msg, parse_mode=ParseMode.MARKDOWN_V2)
         return
 
-    # Get episode data to determine status per season
-    episodes, ep_error = await get_sonarr_episodes(sonarr_id)
+    # Episode data determines status per season
+    episodes, ep_error = episode_result
     if ep_error:
         episodes = []
 
-    # Build season info
-    seasons = series_data.get("seasons", [])
-    # Filter out "specials" (season 0) for cleaner display
-    regular_seasons = [s for s in seasons if s.get("seasonNumber", 0) > 0]
+    # Build season info - "specials" (season 0) are filtered out for cleaner display
+    regular_seasons = sorted_regular_seasons(series_data)
 
     if not regular_seasons:
         msg = f"❌ No seasons found for *{escape_md(title)}*"
@@ -358,43 +507,30 @@ async def show_series_seasons(update, context_or_query, series, user_id):
         return
 
     # Create session
-    session_id = f"moreeps_{user_id}_{int(datetime.now().timestamp())}"
-    moreeps_sessions[session_id] = {
+    session_id = new_session_id()
+    session = {
         "user_id": user_id,
         "sonarr_id": sonarr_id,
         "title": title,
-        "series_data": series_data,
-        "episodes": episodes
+        "regular_seasons": regular_seasons
     }
+    set_session_episodes(session, episodes)
+    moreeps_sessions[session_id] = session
 
-    # Group episodes by season for status info
-    season_eps = {}
-    for ep in episodes:
-        sn = ep.get("seasonNumber", 0)
-        if sn == 0:
-            continue
-        if sn not in season_eps:
-            season_eps[sn] = {"total": 0, "monitored": 0, "has_file": 0}
-        season_eps[sn]["total"] += 1
-        if ep.get("monitored", False):
-            season_eps[sn]["monitored"] += 1
-        if ep.get("hasFile", False):
-            season_eps[sn]["has_file"] += 1
+    # Per-season episode counts were computed when the session was built
+    season_stats = session["season_stats"]
 
     msg = f"📺 *{escape_md(title)}*\n\n"
     msg += "Select a season to manage episodes:\n\n"
 
     keyboard = []
 
-    for season in sorted(regular_seasons, key=lambda s: s.get("seasonNumber", 0)):
+    for season in regular_seasons:
         sn = season.get("seasonNumber", 0)
         monitored = season.get("monitored", False)
 
         # Get episode counts for this season
-        ep_info = season_eps.get(sn, {"total": 0, "monitored": 0, "has_file": 0})
-        total_eps = ep_info["total"]
-        downloaded = ep_info["has_file"]
-        mon_count = ep_info["monitored"]
+        total_eps, mon_count, downloaded = season_stats.get(sn, (0, 0, 0))
 
         # Status indicator
         if downloaded == total_eps and total_eps > 0:
@@ -410,18 +546,18 @@ async def show_series_seasons(update, context_or_query, series, user_id):
 
         keyboard.append([InlineKeyboardButton(
             button_text,
-            callback_data=f"moreeps_season_{session_id}_{sn}"
+            callback_data=build_callback_data("s", session_id, sn)
         )])
 
     # Add "Monitor All Seasons" button
     keyboard.append([InlineKeyboardButton(
         "📦 Monitor All Seasons",
-        callback_data=f"moreeps_allseasons_{session_id}"
+        callback_data=build_callback_data("A", session_id)
     )])
 
     keyboard.append([InlineKeyboardButton(
         "❌ Cancel",
-        callback_data=f"moreeps_cancel_{session_id}"
+        callback_data=build_callback_data("c", session_id)
     )])
 
     msg += "_Legend: ✅ Complete ⏬ Partial 👁️ Monitored ⬜ Not monitored_"
@@ -454,18 +590,14 @@ async def show_season_episodes(query, session_id, season_number):
         return
 
     title = session.get("title", "Unknown")
-    episodes = session.get("episodes", [])
 
     # Initialize selected episodes set if not present
     if "selected_episodes" not in session:
         session["selected_episodes"] = set()
     selected = session["selected_episodes"]
 
-    # Get episodes for this season
-    season_episodes = [
-        ep for ep in episodes
-        if ep.get("seasonNumber") == season_number
-    ]
+    # Episodes for this season (grouped and sorted by episode number when the session was built)
+    season_episodes = session["by_season"].get(season_number, [])
 
     if not season_episodes:
         await query.edit_message_text(
@@ -474,13 +606,8 @@ async def show_season_episodes(query, session_id, season_number):
         )
         return
 
-    # Sort by episode number
-    season_episodes.sort(key=lambda e: e.get("episodeNumber", 0))
-
     # Count stats
-    total = len(season_episodes)
-    monitored = sum(1 for ep in season_episodes if ep.get("monitored", False))
-    downloaded = sum(1 for ep in season_episodes if ep.get("hasFile", False))
+    total, monitored, downloaded = session["season_stats"][season_number]
 
     # Selectable episodes: not downloaded and not already monitored
     selectable_eps = [
@@ -488,8 +615,10 @@ async def show_season_episodes(query, session_id, season_number):
         if not ep.get("hasFile", False) and not ep.get("monitored", False)
     ]
 
-    msg = f"📺 *{escape_md(title)}* \\- Season {season_number}\n\n"
-    msg += f"📊 {downloaded}/{total} downloaded \\| {monitored}/{total} monitored\n\n"
+    parts = [
+        f"📺 *{escape_md(title)}* \\- Season {season_number}\n\n",
+        f"📊 {downloaded}/{total} downloaded \\| {monitored}/{total} monitored\n\n",
+    ]
 
     # Show episode list with status
     for ep in season_episodes:
@@ -512,13 +641,13 @@ async def show_season_episodes(query, session_id, season_number):
         if len(ep_title) > 30:
             ep_title = ep_title[:27] + "..."
 
-        msg += f"{status} E{ep_num:02d} \\- {escape_md(ep_title)}\n"
+        parts.append(f"{status} E{ep_num:02d} \\- {escape_md(ep_title)}\n")
 
     keyboard = []
 
     # Individual episode toggle buttons (only for selectable episodes)
     if selectable_eps:
-        msg += "\n_Tap episodes to select, then monitor:_\n"
+        parts.append("\n_Tap episodes to select, then monitor:_\n")
         row = []
         for ep in selectable_eps:
             ep_num = ep.get("episodeNumber", 0)
@@ -527,7 +656,7 @@ async def show_season_episodes(query, session_id, season_number):
             icon = "☑️" if is_selected else "⬜"
             row.append(InlineKeyboardButton(
                 f"{icon} E{ep_num:02d}",
-                callback_data=f"moreeps_eptog_{session_id}_{ep_id}"
+                callback_data=build_callback_data("t", session_id, ep_id)
             ))
             if len(row) == 4:  # 4 buttons per row
                 keyboard.append(row)
@@ -540,34 +669,34 @@ async def show_season_episodes(query, session_id, season_number):
     if selected_in_season:
         keyboard.append([InlineKeyboardButton(
             f"🔍 Monitor {len(selected_in_season)} Selected Episode(s)",
-            callback_data=f"moreeps_monsel_{session_id}_{season_number}"
+            callback_data=build_callback_data("S", session_id, season_number)
         )])
 
     # Bulk actions
     keyboard.append([InlineKeyboardButton(
         "📦 Monitor All Episodes in Season",
-        callback_data=f"moreeps_monall_{session_id}_{season_number}"
+        callback_data=build_callback_data("a", session_id, season_number)
     )])
 
     if selectable_eps:
         keyboard.append([InlineKeyboardButton(
             f"➕ Monitor {len(selectable_eps)} Missing Episode(s)",
-            callback_data=f"moreeps_monmissing_{session_id}_{season_number}"
+            callback_data=build_callback_data("m", session_id, season_number)
         )])
 
     # Back to seasons
     keyboard.append([InlineKeyboardButton(
         "◀️ Back to Seasons",
-        callback_data=f"moreeps_back_{session_id}"
+        callback_data=build_callback_data("b", session_id)
     )])
 
     keyboard.append([InlineKeyboardButton(
         "❌ Cancel",
-        callback_data=f"moreeps_cancel_{session_id}"
+        callback_data=build_callback_data("c", session_id)
     )])
 
     await query.edit_message_text(
-        msg,
+        "".join(parts),
         parse_mode=ParseMode.MARKDOWN_V2,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
@@ -584,41 +713,46 @@ async def handle_moreeps_callback(update, context: CallbackContext):
     logger.info("🔄 Moreeps callback from user %s: %s", user_id, callback_data)
 
     try:
-        if callback_data.startswith("moreeps_pick_"):
+        # Payload format: m{op}|{session_id}|{arg}
+        op_part, session_token, arg = callback_data.split("|", 2)
+        op = op_part[1:]
+        session_id = int(session_token)
+
+        if op == "p":
             # User picked a series from search results
-            await handle_series_pick(query, callback_data, user_id, update, context)
+            await handle_series_pick(query, session_id, arg, user_id, update, context)
 
-        elif callback_data.startswith("moreeps_season_"):
+        elif op == "s":
             # User picked a season to view episodes
-            await handle_season_pick(query, callback_data, user_id)
+            await handle_season_pick(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_allseasons_"):
+        elif op == "A":
             # Monitor all seasons
-            await handle_monitor_all_seasons(query, callback_data, user_id)
+            await handle_monitor_all_seasons(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_monall_"):
+        elif op == "a":
             # Monitor all episodes in a season
-            await handle_monitor_all_in_season(query, callback_data, user_id)
+            await handle_monitor_all_in_season(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_eptog_"):
+        elif op == "t":
             # Toggle individual episode selection
-            await handle_episode_toggle(query, callback_data, user_id)
+            await handle_episode_toggle(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_monsel_"):
+        elif op == "S":
             # Monitor selected episodes
-            await handle_monitor_selected(query, callback_data, user_id)
+            await handle_monitor_selected(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_monmissing_"):
+        elif op == "m":
             # Monitor only missing/unmonitored episodes
-            await handle_monitor_missing_in_season(query, callback_data, user_id)
+            await handle_monitor_missing_in_season(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_back_"):
+        elif op == "b":
             # Go back to season list
-            await handle_back_to_seasons(query, callback_data, user_id)
+            await handle_back_to_seasons(query, session_id, arg, user_id)
 
-        elif callback_data.startswith("moreeps_cancel_"):
+        elif op == "c":
             # Cancel
-            await handle_moreeps_cancel(query, callback_data, user_id)
+            await handle_moreeps_cancel(query, session_id, arg, user_id)
 
         else:
             logger.warning("Unknown moreeps callback: %s", callback_data)
@@ -631,14 +765,9 @@ async def handle_moreeps_callback(update, context: CallbackContext):
             pass
 
 
-async def handle_series_pick(query, callback_data, user_id, update, context):
+async def handle_series_pick(query, session_id, arg, user_id, update, context):
     """Handle user picking a series from multiple search results"""
-    # Parse: moreeps_pick_{session_id}_{index}
-    parts = callback_data.split("_")
-    # moreeps_pick_{session_id}_{index}
-    # session_id contains the user_id and timestamp, so reconstruct it
-    index = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    index = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -664,12 +793,9 @@ async def handle_series_pick(query, callback_data, user_id, update, context):
     await show_series_seasons(update, query, series, user_id)
 
 
-async def handle_season_pick(query, callback_data, user_id):
+async def handle_season_pick(query, session_id, arg, user_id):
     """Handle user picking a season to view episodes"""
-    # Parse: moreeps_season_{session_id}_{season_number}
-    parts = callback_data.split("_")
-    season_number = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    season_number = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -684,12 +810,8 @@ async def handle_season_pick(query, callback_data, user_id):
     await show_season_episodes(query, session_id, season_number)
 
 
-async def handle_monitor_all_seasons(query, callback_data, user_id):
+async def handle_monitor_all_seasons(query, session_id, arg, user_id):
     """Monitor all episodes across all seasons"""
-    # Parse: moreeps_allseasons_{session_id}
-    parts = callback_data.split("_")
-    session_id = "_".join(parts[2:])
-
     session = moreeps_sessions.get(session_id)
     if not session:
         await query.edit_message_text("❌ Session expired\\. Please try `/moreeps` again\\.",
@@ -722,8 +844,15 @@ async def handle_monitor_all_seasons(query, callback_data, user_id):
         moreeps_sessions.pop(session_id, None)
         return
 
-    # Set monitoring
-    success, error = await set_episode_monitoring(episode_ids, True)
+    # Only search for the newly monitored episodes that don't have files
+    monitor_ids = set(episode_ids)
+    search_ids = [
+        ep["id"] for ep in episodes
+        if ep.get("seasonNumber", 0) > 0 and not ep.get("hasFile", False) and ep["id"] in monitor_ids
+    ]
+
+    # Set monitoring and start the search together - the search only needs the episode IDs
+    success, error, search_success = await monitor_and_search(episode_ids, search_ids)
     if not success:
         await query.edit_message_text(
             f"❌ Failed to set monitoring: {escape_md(error)}",
@@ -731,18 +860,9 @@ async def handle_monitor_all_seasons(query, callback_data, user_id):
         )
         return
 
-    # Trigger search for the newly monitored episodes
-    # Only search for episodes that don't have files
-    search_ids = [
-        ep["id"] for ep in episodes
-        if ep.get("seasonNumber", 0) > 0 and not ep.get("hasFile", False) and ep["id"] in episode_ids
-    ]
-
     search_msg = ""
-    if search_ids:
-        search_success, _ = await trigger_episode_search(search_ids)
-        if search_success:
-            search_msg = f"\n🔍 Searching for {len(search_ids)} missing episode\\(s\\)\\.\\.\\."
+    if search_success:
+        search_msg = f"\n🔍 Searching for {len(search_ids)} missing episode\\(s\\)\\.\\.\\."
 
     await query.edit_message_text(
         f"✅ *{escape_md(title)}*\n\n"
@@ -756,12 +876,9 @@ async def handle_monitor_all_seasons(query, callback_data, user_id):
     moreeps_sessions.pop(session_id, None)
 
 
-async def handle_monitor_all_in_season(query, callback_data, user_id):
+async def handle_monitor_all_in_season(query, session_id, arg, user_id):
     """Monitor all episodes in a specific season"""
-    # Parse: moreeps_monall_{session_id}_{season_number}
-    parts = callback_data.split("_")
-    season_number = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    season_number = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -774,12 +891,10 @@ async def handle_monitor_all_in_season(query, callback_data, user_id):
         return
 
     title = session.get("title", "Unknown")
-    episodes = session.get("episodes", [])
-
     # Get unmonitored episodes in this season
     season_eps = [
-        ep for ep in episodes
-        if ep.get("seasonNumber") == season_number and not ep.get("monitored", False)
+        ep for ep in session["by_season"].get(season_number, [])
+        if not ep.get("monitored", False)
     ]
 
     if not season_eps:
@@ -796,8 +911,11 @@ async def handle_monitor_all_in_season(query, callback_data, user_id):
         parse_mode=ParseMode.MARKDOWN_V2
     )
 
-    # Set monitoring
-    success, error = await set_episode_monitoring(episode_ids, True)
+    # Search for episodes without files
+    search_ids = [ep["id"] for ep in season_eps if not ep.get("hasFile", False)]
+
+    # Set monitoring and start the search together - the search only needs the episode IDs
+    success, error, search_success = await monitor_and_search(episode_ids, search_ids)
     if not success:
         await query.edit_message_text(
             f"❌ Failed to set monitoring: {escape_md(error)}",
@@ -805,14 +923,9 @@ async def handle_monitor_all_in_season(query, callback_data, user_id):
         )
         return
 
-    # Trigger search for episodes without files
-    search_ids = [ep["id"] for ep in season_eps if not ep.get("hasFile", False)]
-
     search_msg = ""
-    if search_ids:
-        search_success, _ = await trigger_episode_search(search_ids)
-        if search_success:
-            search_msg = f"\n🔍 Searching for {len(search_ids)} missing episode\\(s\\)\\.\\.\\."
+    if search_success:
+        search_msg = f"\n🔍 Searching for {len(search_ids)} missing episode\\(s\\)\\.\\.\\."
 
     await query.edit_message_text(
         f"✅ *{escape_md(title)}* \\- Season {season_number}\n\n"
@@ -826,12 +939,9 @@ async def handle_monitor_all_in_season(query, callback_data, user_id):
     moreeps_sessions.pop(session_id, None)
 
 
-async def handle_monitor_missing_in_season(query, callback_data, user_id):
+async def handle_monitor_missing_in_season(query, session_id, arg, user_id):
     """Monitor only missing (unmonitored + no file) episodes in a season"""
-    # Parse: moreeps_monmissing_{session_id}_{season_number}
-    parts = callback_data.split("_")
-    season_number = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    season_number = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -844,14 +954,10 @@ async def handle_monitor_missing_in_season(query, callback_data, user_id):
         return
 
     title = session.get("title", "Unknown")
-    episodes = session.get("episodes", [])
-
     # Get unmonitored episodes without files in this season
     missing_eps = [
-        ep for ep in episodes
-        if ep.get("seasonNumber") == season_number
-        and not ep.get("monitored", False)
-        and not ep.get("hasFile", False)
+        ep for ep in session["by_season"].get(season_number, [])
+        if not ep.get("monitored", False) and not ep.get("hasFile", False)
     ]
 
     if not missing_eps:
@@ -868,8 +974,11 @@ async def handle_monitor_missing_in_season(query, callback_data, user_id):
         parse_mode=ParseMode.MARKDOWN_V2
     )
 
-    # Set monitoring
-    success, error = await set_episode_monitoring(episode_ids, True)
+    # Every missing episode needs a search
+    search_ids = episode_ids
+
+    # Set monitoring and start the search together - the search only needs the episode IDs
+    success, error, search_success = await monitor_and_search(episode_ids, search_ids)
     if not success:
         await query.edit_message_text(
             f"❌ Failed to set monitoring: {escape_md(error)}",
@@ -877,9 +986,6 @@ async def handle_monitor_missing_in_season(query, callback_data, user_id):
         )
         return
 
-    # Trigger search
-    search_success, _ = await trigger_episode_search(episode_ids)
-
     search_msg = ""
     if search_success:
         search_msg = f"\n🔍 Searching for {len(episode_ids)} episode\\(s\\)\\.\\.\\."
@@ -896,12 +1002,9 @@ async def handle_monitor_missing_in_season(query, callback_data, user_id):
     moreeps_sessions.pop(session_id, None)
 
 
-async def handle_episode_toggle(query, callback_data, user_id):
+async def handle_episode_toggle(query, session_id, arg, user_id):
     """Toggle an individual episode selection on/off"""
-    # Parse: moreeps_eptog_{session_id}_{episode_id}
-    parts = callback_data.split("_")
-    episode_id = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    episode_id = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -937,12 +1040,9 @@ async def handle_episode_toggle(query, callback_data, user_id):
     await show_season_episodes(query, session_id, season_number)
 
 
-async def handle_monitor_selected(query, callback_data, user_id):
+async def handle_monitor_selected(query, session_id, arg, user_id):
     """Monitor only the user-selected episodes"""
-    # Parse: moreeps_monsel_{session_id}_{season_number}
-    parts = callback_data.split("_")
-    season_number = int(parts[-1])
-    session_id = "_".join(parts[2:-1])
+    season_number = int(arg)
 
     session = moreeps_sessions.get(session_id)
     if not session:
@@ -955,13 +1055,12 @@ async def handle_monitor_selected(query, callback_data, user_id):
         return
 
     title = session.get("title", "Unknown")
-    episodes = session.get("episodes", [])
     selected = session.get("selected_episodes", set())
 
     # Get selected episodes in this season
     selected_eps = [
-        ep for ep in episodes
-        if ep.get("id") in selected and ep.get("seasonNumber") == season_number
+        ep for ep in session["by_season"].get(season_number, [])
+        if ep.get("id") in selected
     ]
 
     if not selected_eps:
@@ -977,8 +1076,11 @@ async def handle_monitor_selected(query, callback_data, user_id):
         parse_mode=ParseMode.MARKDOWN_V2
     )
 
-    # Set monitoring
-    success, error = await set_episode_monitoring(episode_ids, True)
+    # Search for episodes without files
+    search_ids = [ep["id"] for ep in selected_eps if not ep.get("hasFile", False)]
+
+    # Set monitoring and start the search together - the search only needs the episode IDs
+    success, error, search_success = await monitor_and_search(episode_ids, search_ids)
     if not success:
         await query.edit_message_text(
             f"❌ Failed to set monitoring: {escape_md(error)}",
@@ -986,14 +1088,9 @@ async def handle_monitor_selected(query, callback_data, user_id):
         )
         return
 
-    # Trigger search for episodes without files
-    search_ids = [ep["id"] for ep in selected_eps if not ep.get("hasFile", False)]
-
     search_msg = ""
-    if search_ids:
-        search_success, _ = await trigger_episode_search(search_ids)
-        if search_success:
-            search_msg = f"\n🔍 Searching for {len(search_ids)} episode\\(s\\)\\.\\.\\."
+    if search_success:
+        search_msg = f"\n🔍 Searching for {len(search_ids)} episode\\(s\\)\\.\\.\\."
 
     await query.edit_message_text(
         f"✅ *{escape_md(title)}* \\- Season {season_number}\n\n"
@@ -1007,12 +1104,8 @@ async def handle_monitor_selected(query, callback_data, user_id):
     moreeps_sessions.pop(session_id, None)
 
 
-async def handle_back_to_seasons(query, callback_data, user_id):
+async def handle_back_to_seasons(query, session_id, arg, user_id):
     """Go back to season list"""
-    # Parse: moreeps_back_{session_id}
-    parts = callback_data.split("_")
-    session_id = "_".join(parts[2:])
-
     session = moreeps_sessions.get(session_id)
     if not session:
         await query.edit_message_text("❌ Session expired\\. Please try `/moreeps` again\\.",
@@ -1031,42 +1124,23 @@ async def handle_back_to_seasons(query, callback_data, user_id):
     if sonarr_id:
         episodes, ep_error = await get_sonarr_episodes(sonarr_id)
         if not ep_error:
-            session["episodes"] = episodes
+            set_session_episodes(session, episodes)
 
-    # Rebuild the series object from session data
-    series_data = session.get("series_data", {})
+    # Rebuild the season list from session data
     title = session.get("title", "Unknown")
-    episodes = session.get("episodes", [])
+    regular_seasons = session.get("regular_seasons", [])
 
-    # Get seasons from series_data
-    seasons = series_data.get("seasons", [])
-    regular_seasons = [s for s in seasons if s.get("seasonNumber", 0) > 0]
-
-    # Group episodes by season for status info
-    season_eps = {}
-    for ep in episodes:
-        sn = ep.get("seasonNumber", 0)
-        if sn == 0:
-            continue
-        if sn not in season_eps:
-            season_eps[sn] = {"total": 0, "monitored": 0, "has_file": 0}
-        season_eps[sn]["total"] += 1
-        if ep.get("monitored", False):
-            season_eps[sn]["monitored"] += 1
-        if ep.get("hasFile", False):
-            season_eps[sn]["has_file"] += 1
+    # Per-season episode counts were computed when the session was built
+    season_stats = session["season_stats"]
 
     msg = f"📺 *{escape_md(title)}*\n\n"
     msg += "Select a season to manage episodes:\n\n"
 
     keyboard = []
-    for season in sorted(regular_seasons, key=lambda s: s.get("seasonNumber", 0)):
+    for season in regular_seasons:
         sn = season.get("seasonNumber", 0)
 
-        ep_info = season_eps.get(sn, {"total": 0, "monitored": 0, "has_file": 0})
-        total_eps = ep_info["total"]
-        downloaded = ep_info["has_file"]
-        mon_count = ep_info["monitored"]
+        total_eps, mon_count, downloaded = season_stats.get(sn, (0, 0, 0))
 
         if downloaded == total_eps and total_eps > 0:
             status = "✅"
@@ -1081,17 +1155,17 @@ async def handle_back_to_seasons(query, callback_data, user_id):
 
         keyboard.append([InlineKeyboardButton(
             button_text,
-            callback_data=f"moreeps_season_{session_id}_{sn}"
+            callback_data=build_callback_data("s", session_id, sn)
         )])
 
     keyboard.append([InlineKeyboardButton(
         "📦 Monitor All Seasons",
-        callback_data=f"moreeps_allseasons_{session_id}"
+        callback_data=build_callback_data("A", session_id)
     )])
 
     keyboard.append([InlineKeyboardButton(
         "❌ Cancel",
-        callback_data=f"moreeps_cancel_{session_id}"
+        callback_data=build_callback_data("c", session_id)
     )])
 
     msg += "_Legend: ✅ Complete ⏬ Partial 👁️ Monitored ⬜ Not monitored_"
@@ -1103,12 +1177,8 @@ async def handle_back_to_seasons(query, callback_data, user_id):
     )
 
 
-async def handle_moreeps_cancel(query, callback_data, user_id):
+async def handle_moreeps_cancel(query, session_id, arg, user_id):
     """Cancel moreeps session"""
-    # Parse: moreeps_cancel_{session_id}
-    parts = callback_data.split("_")
-    session_id = "_".join(parts[2:])
-
     session = moreeps_sessions.get(session_id)
     if session and session["user_id"] != user_id:
         await query.answer("❌ This is not your search.", show_alert=True)
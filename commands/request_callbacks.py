@@ -181,10 +181,10 @@ async def handle_request_callback(update, context: CallbackContext):
 
 async def handle_sonarr_partial(query, callback_data):
     """Handle partial Sonarr button — launch moreeps season UI directly for the show"""
-    from datetime import datetime as _dt
     from commands.moreeps_commands import (
         search_sonarr_series, get_sonarr_series_details,
-        get_sonarr_episodes, moreeps_sessions
+        get_sonarr_episodes, moreeps_sessions, new_session_id, build_callback_data,
+        sorted_regular_seasons, set_session_episodes
     )
 
     # Parse: sonarr_partial_{search_id}_{index}
@@ -252,41 +252,26 @@ async def handle_sonarr_partial(query, callback_data):
     episodes = episodes or []
 
     # Create a moreeps session so all existing moreeps callbacks work
-    session_id = f"moreeps_{user_id}_{int(_dt.now().timestamp())}"
-    moreeps_sessions[session_id] = {
+    session_id = new_session_id()
+    session = {
         "user_id": user_id,
         "sonarr_id": sonarr_id,
         "title": title,
-        "series_data": series_data,
-        "episodes": episodes,
+        "regular_seasons": sorted_regular_seasons(series_data),
     }
+    set_session_episodes(session, episodes)
+    moreeps_sessions[session_id] = session
 
     # Build season list (mirrors show_series_seasons logic)
-    seasons = series_data.get("seasons", [])
-    regular_seasons = [s for s in seasons if s.get("seasonNumber", 0) > 0]
-
-    season_eps = {}
-    for ep in episodes:
-        sn = ep.get("seasonNumber", 0)
-        if sn == 0:
-            continue
-        if sn not in season_eps:
-            season_eps[sn] = {"total": 0, "monitored": 0, "has_file": 0}
-        season_eps[sn]["total"] += 1
-        if ep.get("monitored"):
-            season_eps[sn]["monitored"] += 1
-        if ep.get("hasFile"):
-            season_eps[sn]["has_file"] += 1
+    regular_seasons = session["regular_seasons"]
+    season_stats = session["season_stats"]
 
     msg = f"📺 *{escape_md(title)}*\n\nSelect a season to manage episodes:\n\n"
     keyboard = []
 
-    for season in sorted(regular_seasons, key=lambda s: s.get("seasonNumber", 0)):
+    for season in regular_seasons:
         sn = season.get("seasonNumber", 0)
-        ep_info = season_eps.get(sn, {"total": 0, "monitored": 0, "has_file": 0})
-        total_eps = ep_info["total"]
-        downloaded = ep_info["has_file"]
-        mon_count = ep_info["monitored"]
+        total_eps, mon_count, downloaded = season_stats.get(sn, (0, 0, 0))
 
         if downloaded == total_eps and total_eps > 0:
             status = "✅"
@@ -299,16 +284,16 @@ async def handle_sonarr_partial(query, callback_data):
 
         keyboard.append([InlineKeyboardButton(
             f"{status} Season {sn} ({downloaded}/{total_eps} eps)",
-            callback_data=f"moreeps_season_{session_id}_{sn}"
+            callback_data=build_callback_data("s", session_id, sn)
         )])
 
     keyboard.append([InlineKeyboardButton(
         "📦 Monitor All Seasons",
-        callback_data=f"moreeps_allseasons_{session_id}"
+        callback_data=build_callback_data("A", session_id)
     )])
     keyboard.append([InlineKeyboardButton(
         "❌ Cancel",
-        callback_data=f"moreeps_cancel_{session_id}"
+        callback_data=build_callback_data("c", session_id)
     )])
 
     msg += "_Legend: ✅ Complete ⏬ Partial 👁️ Monitored ⬜ Not monitored_"
@@ -5,6 +5,7 @@ Similar to Searcharr but simplified for group chat use without authentication
 """
 
 import re
+import time
 import logging
 from datetime import datetime
 from telegram.ext import CallbackContext
@@ -23,6 +24,7 @@ from config import (
     TAUTILLI_URL, TAUTILLI_API_KEY
 )
 from utils.helpers import send_command_response, escape_md
+from utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +96,9 @@ COUNTRY_QUALIFIERS = {
     "italian":    "IT",
 }
 
+# Root folders rarely change; reuse them for this many seconds
+ROOT_FOLDER_CACHE_TTL = 600
+
 # Articles to try stripping in fallback searches
 _ARTICLES = re.compile(r"^(the|a|an)\s+", re.IGNORECASE)
 
@@ -247,6 +252,11 @@ class RequestManager:
     
     def __init__(self):
         self.active_searches = {}  # Store search results by message_id
+        self._root_folder_cache = {}  # service -> (fetched_at, folders)
+
+    def invalidate_folders_cache(self):
+        """Drop cached Radarr/Sonarr root folders so the next call refetches"""
+        self._root_folder_cache.clear()
 
     async def purge_stale_searches(self, bot=None, ttl_minutes: int = 30) -> int:
         """
@@ -434,30 +444,35 @@ class RequestManager:
         return ranked, None, used_query
 
     async def get_radarr_root_folders(self):
-        """Get available root folders from Radarr"""
+        """Get available root folders from Radarr (cached for ROOT_FOLDER_CACHE_TTL)"""
         if not (RADARR_URL and RADARR_API_KEY):
             return None, "Radarr not configured"
 
+        cached = self._root_folder_cache.get("radarr")
+        if cached and time.monotonic() - cached[0] < ROOT_FOLDER_CACHE_TTL:
+            return cached[1], None
+
         try:
             base_url = RADARR_URL.rstrip('/')
             headers = {"X-Api-Key": RADARR_API_KEY}
 
-            async with AsyncClient() as client:
-                # Try v3 first, then v2, then v1
-                for api_version in ["v3", "v2", "v1"]:
-                    url = f"{base_url}/api/{api_version}/rootfolder"
-                    try:
-                        resp = await client.get(url, headers=headers)
-                        if resp.status_code == 200:
-                            folders = resp.json()
-                            logger.info("✅ Radarr root folders fetched using API %s", api_version)
-                            return folders, None
-                        elif resp.status_code == 404:
-                            continue
-                    except Exception:
+            client = get_http_client()
+            # Try v3 first, then v2, then v1
+            for api_version in ["v3", "v2", "v1"]:
+                url = f"{base_url}/api/{api_version}/rootfolder"
+                try:
+                    resp = await client.get(url, headers=headers)
+                    if resp.status_code == 200:
+                        folders = resp.json()
+                        logger.info("✅ Radarr root folders fetched using API %s", api_version)
+                        self._root_folder_cache["radarr"] = (time.monotonic(), folders)
+                        return folders, None
+                    elif resp.status_code == 404:
                         continue
+                except Exception:
+                    continue
 
-                return None, "Server is offline. Please use /on to wake it up, then try again."
+            return None, "Server is offline. Please use /on to wake it up, then try again."
 
         except Exception as e:
             logger.error("❌ Radarr root folders fetch failed: %s", e)
@@ -494,30 +509,35 @@ class RequestManager:
             return None, str(e)
     
     async def get_sonarr_root_folders(self):
-        """Get available root folders from Sonarr"""
+        """Get available root folders from Sonarr (cached for ROOT_FOLDER_CACHE_TTL)"""
         if not (SONARR_URL and SONARR_API_KEY):
             return None, "Sonarr not configured"
 
+        cached = self._root_folder_cache.get("sonarr")
+        if cached and time.monotonic() - cached[0] < ROOT_FOLDER_CACHE_TTL:
+            return cached[1], None
+
         try:
             base_url = SONARR_URL.rstrip('/')
             headers = {"X-Api-Key": SONARR_API_KEY}
 
-            async with AsyncClient() as client:
-                # Try v3 first, then v2, then v1
-                for api_version in ["v3", "v2", "v1"]:
-                    url = f"{base_url}/api/{api_version}/rootfolder"
-                    try:
-                        resp = await client.get(url, headers=headers)
-                        if resp.status_code == 200:
-                            folders = resp.json()
-                            logger.info("✅ Sonarr root folders fetched using API %s", api_version)
-                            return folders, None
-                        elif resp.status_code == 404:
-                            continue
-                    except Exception:
+            client = get_http_client()
+            # Try v3 first, then v2, then v1
+            for api_version in ["v3", "v2", "v1"]:
+                url = f"{base_url}/api/{api_version}/rootfolder"
+                try:
+                    resp = await client.get(url, headers=headers)
+                    if resp.status_code == 200:
+                        folders = resp.json()
+                        logger.info("✅ Sonarr root folders fetched using API %s", api_version)
+                        self._root_folder_cache["sonarr"] = (time.monotonic(), folders)
+                        return folders, None
+                    elif resp.status_code == 404:
                         continue
+                except Exception:
+                    continue
 
-                return None, "Server is offline. Please use /on to wake it up, then try again."
+            return None, "Server is offline. Please use /on to wake it up, then try again."
 
         except Exception as e:
             logger.error("❌ Sonarr root folders fetch failed: %s", e)
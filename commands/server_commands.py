@@ -14,11 +14,11 @@ from wakeonlan import send_magic_packet
 from httpx import AsyncClient
 
 from config import (
-    OFF_USER_IDS, PLEX_MAC, PLEX_BROADCAST_IP,
+    PLEX_MAC, PLEX_BROADCAST_IP,
     PLEX_SERVER_IP, PLEX_SSH_USER, PLEX_SSH_PASSWORD,
     PLEX_PUBLIC_IP, PLEX_EXTERNAL_PORT
 )
-from utils.helpers import send_command_response, escape_md
+from utils.helpers import send_command_response, escape_md, require_admin
 from utils.server_status import check_server_status
 
 logger = logging.getLogger(__name__)
@@ -40,12 +40,9 @@ async def on_command(update, context: CallbackContext):
         logger.error("❌ Manual WOL failed: %s", e)
         await send_command_response(update, context, f"❌ Wake\\-on\\-LAN failed: {escape_md(str(e))}", parse_mode=ParseMode.MARKDOWN_V2)
 
+@require_admin
 async def off_command(update, context: CallbackContext):
     """Shutdown server command (authorized users only)"""
-    user_id = update.effective_user.id
-    if user_id not in OFF_USER_IDS:
-        return await send_command_response(update, context, "❌ Not authorized.")
-    
     try:
         logger.info("🔌 Attempting to shutdown server %s", PLEX_SERVER_IP)
         
@@ -36,7 +36,7 @@ AUTO_SHUTDOWN_MINUTE = int(os.getenv("AUTO_SHUTDOWN_MINUTE", "0"))
 AUTO_SHUTDOWN_RECHECK_MINUTES = int(os.getenv("AUTO_SHUTDOWN_RECHECK_MINUTES", "30"))
 
 # Telegram user IDs allowed to run /off and admin commands
-OFF_USER_IDS = {int(uid) for uid in os.getenv("OFF_USER_IDS", "").split(",") if uid.strip()}
+OFF_USER_IDS = frozenset(int(uid) for uid in os.getenv("OFF_USER_IDS", "").split(",") if uid.strip())
 
 # --- API Tokens ---
 TMDB_BEARER_TOKEN = os.getenv("TMDB_API_READ_TOKEN", "")
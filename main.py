@@ -15,18 +15,22 @@ from apscheduler.triggers.cron import CronTrigger
 
 from config import *
 from utils.logging_setup import setup_logging
+from utils.http_client import close_http_client
 from utils.server_status import scheduled_wake, scheduled_shutdown
-from commands.media_commands import nowplaying_command, upcoming_command, hot_command, stats_command, queue_command, search_plex_command
+from commands.media_commands import (
+    nowplaying_command, upcoming_command, hot_command, stats_command, queue_command, search_plex_command,
+    warm_api_versions
+)
 from commands.server_commands import on_command, off_command, check_status_command, remote_check_command
 from commands.admin_commands import (
     debug_command, logs_command, testwake_command, info_command, welcome_command,
     requests_admin_command, clearrequest_command, clearrequests_command,
-    new_member_handler
+    refreshcache_command, new_member_handler
 )
 from commands.request_commands import movie_command, series_command, tv_command
 from commands.request_callbacks import handle_request_callback
 from commands.request_status_commands import myrequests_command
-from commands.moreeps_commands import moreeps_command, handle_moreeps_callback
+from commands.moreeps_commands import moreeps_command, handle_moreeps_callback, CALLBACK_PATTERN as MOREEPS_CALLBACK_PATTERN
 
 # Setup logging first
 setup_logging()
@@ -135,9 +139,19 @@ async def on_startup(app):
         else:
             logger.info("⏰ Job '%s' next run: Never", job.id)
 
+    # Detect Sonarr/Radarr API versions in the background so /upcoming never has to probe
+    app.create_task(warm_api_versions())
+
     logger.info("🚀 Bot startup complete at %s", datetime.now(MELBOURNE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z'))
 
 
+async def on_shutdown(app):
+    """Release shared resources on bot shutdown"""
+    from utils.request_tracker import request_tracker
+    request_tracker.flush()
+    await close_http_client()
+
+
 async def error_handler(update, context):
     """Global error handler for the bot - handles transient network errors gracefully"""
     error = context.error
@@ -168,6 +182,7 @@ def main():
     """Main function to start the bot"""
     builder = ApplicationBuilder().token(BOT_TOKEN)
     builder.post_init(on_startup)
+    builder.post_shutdown(on_shutdown)
     app = builder.build()
 
     # Register global error handler for graceful error handling
@@ -228,6 +243,7 @@ def main():
     app.add_handler(CommandHandler("listrequests", requests_admin_command, filters=topic_filter))
     app.add_handler(CommandHandler("clearrequest", clearrequest_command, filters=topic_filter))
     app.add_handler(CommandHandler("clearrequests", clearrequests_command, filters=topic_filter))
+    app.add_handler(CommandHandler("refreshcache", refreshcache_command, filters=topic_filter))
 
     # New member welcome handler
     app.add_handler(MessageHandler(
@@ -236,7 +252,7 @@ def main():
     ))
 
     # Callback query handlers (pattern-filtered to avoid conflicts)
-    app.add_handler(CallbackQueryHandler(handle_moreeps_callback, pattern=r"^moreeps_"))
+    app.add_handler(CallbackQueryHandler(handle_moreeps_callback, pattern=MOREEPS_CALLBACK_PATTERN))
     app.add_handler(CallbackQueryHandler(handle_request_callback))
 
     logger.info("🚀 Bot starting up...")
@@ -4,10 +4,11 @@ Shared functionality used across the bot
 """
 
 import logging
+from functools import lru_cache, wraps
 from telegram.ext import CallbackContext
 from telegram.constants import ParseMode
 from telegram import Bot
-from config import GROUP_CHAT_ID, BOT_TOPIC_ID, SILENT_NOTIFICATIONS
+from config import GROUP_CHAT_ID, BOT_TOPIC_ID, SILENT_NOTIFICATIONS, OFF_USER_IDS
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +33,23 @@ def is_bot_topic(update) -> bool:
     # If no thread_id attribute, allow (backwards compatibility)
     return True
 
+# Translation table for MarkdownV2 reserved characters (single pass via str.translate)
+_MDV2_ESCAPE_TABLE = str.maketrans({ch: f"\\{ch}" for ch in "_*[]()~`>#+-=|{}.!"})
+
+def require_admin(func):
+    """Decorator: only run the command for users listed in OFF_USER_IDS"""
+    @wraps(func)
+    async def wrapper(update, context: CallbackContext, *args, **kwargs):
+        if update.effective_user.id not in OFF_USER_IDS:
+            return await send_command_response(update, context, "❌ Not authorized.")
+        return await func(update, context, *args, **kwargs)
+    return wrapper
+
 def escape_md(text: str) -> str:
     """Escape markdown V2 special characters"""
     if text is None:
         return ""
-    text = str(text)  # Convert to string in case it's a number
-    for ch in ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']:
-        text = text.replace(ch, f"\\{ch}")
-    return text
+    return str(text).translate(_MDV2_ESCAPE_TABLE)  # str() in case it's a number
 
 def safe_format_number(number, decimal_places=1):
     """Safely format a number for Markdown V2"""
@@ -52,6 +62,7 @@ def safe_format_number(number, decimal_places=1):
     except (ValueError, TypeError):
         return escape_md(str(number))
 
+@lru_cache(maxsize=2048)
 def format_duration(seconds):
     """Convert seconds to human readable duration"""
     if not seconds or seconds == 0:
@@ -70,6 +81,8 @@ async def send_command_response(update, context: CallbackContext, message: str,
 
     Note: Commands are now filtered to only work in bot topic (ID 15980),
     so this will always send to the bot topic where the command originated.
+
+    Returns the sent Message, or None if every send attempt failed.
     """
     # Use config setting if not explicitly specified
     if silent is None:
@@ -77,7 +90,7 @@ async def send_command_response(update, context: CallbackContext, message: str,
 
     try:
         # Send to bot topic
-        await context.bot.send_message(
+        sent = await context.bot.send_message(
             chat_id=GROUP_CHAT_ID,
             text=message,
             message_thread_id=BOT_TOPIC_ID,
@@ -85,25 +98,29 @@ async def send_command_response(update, context: CallbackContext, message: str,
             disable_notification=silent
         )
         logger.info("✅ Command response sent to bot topic (silent: %s)", silent)
+        return sent
 
     except Exception as e:
         logger.error("❌ Failed to send command response: %s", e)
         # Fallback: send to where command was issued
         try:
             if update.message and hasattr(update.message, 'reply_text'):
-                await update.message.reply_text(message, parse_mode=parse_mode, disable_notification=silent)
+                sent = await update.message.reply_text(message, parse_mode=parse_mode, disable_notification=silent)
                 logger.info("✅ Command response sent as fallback to original location (silent: %s)", silent)
+                return sent
             else:
                 # Last resort: send to main group without topic
-                await context.bot.send_message(
+                sent = await context.bot.send_message(
                     chat_id=GROUP_CHAT_ID,
                     text=message,
                     parse_mode=parse_mode,
                     disable_notification=silent
                 )
                 logger.info("✅ Command response sent to main group as last resort (silent: %s)", silent)
+                return sent
         except Exception as fallback_error:
             logger.error("❌ Failed to send response even as fallback: %s", fallback_error)
+        return None
 
 async def send_to_bot_topic(bot: Bot, message: str, parse_mode=None, silent=None):
     """Send a message to the dedicated bot topic"""
@@ -0,0 +1,39 @@
+"""
+Shared HTTP client
+A single pooled httpx.AsyncClient reused across commands so connections stay alive
+"""
+
+import logging
+import httpx
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 lets TMDB fan-outs multiplex on one TLS connection; plain-HTTP
+        # services on the LAN (Sonarr/Radarr/Tautulli) keep using HTTP/1.1
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            # Commands are sporadic, so keep idle connections well beyond httpx's 5s default
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300)
+        )
+        logger.info("🌐 Shared HTTP client created")
+    return _client
+
+def decode_json(resp: httpx.Response):
+    """Decode a JSON response body with orjson (much faster than resp.json() on large payloads)"""
+    return orjson.loads(resp.content)
+
+async def close_http_client():
+    """Close the shared AsyncClient (called on bot shutdown)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("🌐 Shared HTTP client closed")
+    _client = None
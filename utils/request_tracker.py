@@ -3,11 +3,15 @@ Request tracking system for monitoring content requests and their status
 Tracks movies/TV shows added to Radarr/Sonarr and notifies users when available
 """
 
+import asyncio
 import json
 import logging
+import os
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
 from httpx import AsyncClient
 from telegram import Bot
 
@@ -24,12 +28,35 @@ STALL_HOURS = 4
 # Storage file for tracking requests
 REQUESTS_DB_FILE = Path(__file__).parent.parent / "data" / "requests.json"
 
+# Delay used to coalesce bursts of mutations into a single disk write
+SAVE_DEBOUNCE_SECONDS = 0.25
+
+# Predicates for the admin display buckets
+_BUCKET_FILTERS = {
+    "pending": lambda r: not r.get("notified", False) and r.get("status") != "unreleased",
+    "unreleased": lambda r: r.get("status") == "unreleased",
+    "completed": lambda r: r.get("notified", False),
+}
+
 
 class RequestTracker:
     """Manages tracking of content requests and their download status"""
 
     def __init__(self):
         self.requests = self._load_requests()
+        self._by_id: Dict[str, Dict] = {}
+        self._reindex()
+        self._dirty = False
+        self._save_handle = None
+        self._flush_task = None
+        # Snapshot sequence numbers: the latest taken, and the latest written to disk
+        self._save_seq = 0
+        self._written_seq = 0
+        self._write_lock = threading.Lock()
+
+    def _reindex(self):
+        """Rebuild the id -> request index after the request list is replaced"""
+        self._by_id = {r["id"]: r for r in self.requests["requests"] if "id" in r}
 
     def _ensure_data_dir(self):
         """Ensure data directory exists"""
@@ -50,15 +77,77 @@ class RequestTracker:
             logger.error("❌ Failed to load requests database: %s", e)
             return {"requests": []}
 
+    def _snapshot(self) -> Tuple[int, str]:
+        """Serialize the database on the loop thread, tagged with an increasing sequence number"""
+        self._dirty = False
+        self._save_seq += 1
+        return self._save_seq, json.dumps(self.requests, indent=2)
+
+    def _write_requests_file(self, seq: int, payload: str):
+        """Atomically write a serialized snapshot, unless a newer one is already on disk
+
+        Every save (sync or worker thread) goes through here, so writes never
+        interleave and an older snapshot can't overwrite a newer one.
+        """
+        with self._write_lock:
+            if seq <= self._written_seq:
+                logger.debug("💾 Skipped stale requests snapshot #%d", seq)
+                return
+            try:
+                self._ensure_data_dir()
+                tmp_file = REQUESTS_DB_FILE.with_suffix(".json.tmp")
+                with open(tmp_file, 'w') as f:
+                    f.write(payload)
+                os.replace(tmp_file, REQUESTS_DB_FILE)
+                self._written_seq = seq
+                logger.debug("💾 Saved requests database")
+            except Exception as e:
+                logger.error("❌ Failed to save requests database: %s", e)
+
     def _save_requests(self):
         """Save requests to JSON file"""
-        try:
-            self._ensure_data_dir()
-            with open(REQUESTS_DB_FILE, 'w') as f:
-                json.dump(self.requests, f, indent=2)
-            logger.debug("💾 Saved requests database")
-        except Exception as e:
-            logger.error("❌ Failed to save requests database: %s", e)
+        # This write covers any pending debounced save
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._write_requests_file(*self._snapshot())
+
+    async def save_requests_async(self):
+        """Save requests without blocking the event loop
+
+        Serializes on the loop thread (so concurrent mutations can't race the
+        encoder) and only hands the file write to a worker thread.
+        """
+        await asyncio.to_thread(self._write_requests_file, *self._snapshot())
+
+    def schedule_save(self):
+        """Mark the database dirty and write it once after a short debounce"""
+        self._dirty = True
+        if self._save_handle is None:
+            loop = asyncio.get_running_loop()
+            self._save_handle = loop.call_later(SAVE_DEBOUNCE_SECONDS, self._start_flush)
+
+    def _start_flush(self):
+        """Debounce timer callback - kick off the async write"""
+        self._save_handle = None
+        self._flush_task = asyncio.ensure_future(self._flush_if_dirty())
+
+    async def _flush_if_dirty(self):
+        """Write the database if anything changed since the last save"""
+        if self._dirty:
+            await self.save_requests_async()
+
+    def flush(self):
+        """Write any pending debounced changes immediately (used on shutdown)
+
+        An in-flight async flush holds an older snapshot, so it either finishes
+        first (the write lock) or is skipped as stale.
+        """
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._dirty:
+            self._save_requests()
 
     def add_request(self, media_type: str, title: str, year: int, user_id: int,
                     username: str, tmdb_id: int = None, tvdb_id: int = None,
@@ -99,6 +188,7 @@ class RequestTracker:
         }
 
         self.requests["requests"].append(request_data)
+        self._by_id[request_data["id"]] = request_data
         self._save_requests()
 
         logger.info("📝 Added request: %s (%d) by user %s", title, year, username)
@@ -125,29 +215,30 @@ class RequestTracker:
         Returns:
             True if subscriber was added, False if already subscribed
         """
-        for request in self.requests["requests"]:
-            if request["id"] == request_id:
-                # Initialize subscribers list if not present (for old requests)
-                if "subscribers" not in request:
-                    request["subscribers"] = [{
-                        "user_id": request["user_id"],
-                        "username": request.get("username", "Unknown")
-                    }]
-
-                # Check if user is already subscribed
-                for sub in request["subscribers"]:
-                    if sub["user_id"] == user_id:
-                        return False
-
-                # Add new subscriber
-                request["subscribers"].append({
-                    "user_id": user_id,
-                    "username": username
-                })
-                self._save_requests()
-                logger.info("👥 Added subscriber %s to request %s", username, request_id)
-                return True
-        return False
+        request = self._by_id.get(request_id)
+        if request is None:
+            return False
+
+        # Initialize subscribers list if not present (for old requests)
+        if "subscribers" not in request:
+            request["subscribers"] = [{
+                "user_id": request["user_id"],
+                "username": request.get("username", "Unknown")
+            }]
+
+        # Check if user is already subscribed
+        for sub in request["subscribers"]:
+            if sub["user_id"] == user_id:
+                return False
+
+        # Add new subscriber
+        request["subscribers"].append({
+            "user_id": user_id,
+            "username": username
+        })
+        self._save_requests()
+        logger.info("👥 Added subscriber %s to request %s", username, request_id)
+        return True
 
     def is_release_date_future(self, release_date: str) -> bool:
         """Check if release date is in the future"""
@@ -177,32 +268,95 @@ class RequestTracker:
         """Get all requests that haven't been notified yet"""
         return [r for r in self.requests["requests"] if not r.get("notified", False)]
 
+    def get_request(self, request_id: str) -> Optional[Dict]:
+        """Look up a request by its exact ID"""
+        return self._by_id.get(request_id)
+
+    def bucket_counts(self) -> Counter:
+        """Count pending/unreleased/completed requests in a single pass"""
+        counts = Counter()
+        for r in self.requests["requests"]:
+            for name, predicate in _BUCKET_FILTERS.items():
+                if predicate(r):
+                    counts[name] += 1
+        return counts
+
+    def iter_bucket(self, name: str) -> Iterator[Dict]:
+        """
+        Lazily yield requests in a display bucket
+
+        Buckets are "pending", "unreleased" and "completed". A notified request
+        that is still marked unreleased appears in both unreleased and completed.
+        """
+        predicate = _BUCKET_FILTERS[name]
+        return (r for r in self.requests["requests"] if predicate(r))
+
     def update_request_status(self, request_id: str, status: str, notified: bool = None):
         """Update status of a request"""
-        for request in self.requests["requests"]:
-            if request["id"] == request_id:
-                request["status"] = status
-                request["updated_at"] = datetime.now().isoformat()
-                if notified is not None:
-                    request["notified"] = notified
-                self._save_requests()
-                logger.info("🔄 Updated request %s: status=%s, notified=%s",
-                          request_id, status, notified)
-                return True
-        return False
+        request = self._by_id.get(request_id)
+        if request is None:
+            return False
+        request["status"] = status
+        request["updated_at"] = datetime.now().isoformat()
+        if notified is not None:
+            request["notified"] = notified
+        self._save_requests()
+        logger.info("🔄 Updated request %s: status=%s, notified=%s",
+                  request_id, status, notified)
+        return True
 
     def remove_request(self, request_id: str) -> bool:
         """Remove a specific request by ID"""
-        original_count = len(self.requests["requests"])
+        if request_id not in self._by_id:
+            return False
         self.requests["requests"] = [
             r for r in self.requests["requests"]
             if r.get("id") != request_id
         ]
+        del self._by_id[request_id]
+        self._save_requests()
+        return True
+
+    def remove_requests_by_prefix(self, prefix: str) -> int:
+        """
+        Remove requests whose ID matches prefix (exact IDs are an O(1) lookup)
+
+        Returns:
+            Number of requests removed
+        """
+        if prefix in self._by_id:
+            doomed = {prefix}
+        else:
+            doomed = {rid for rid in self._by_id if rid.startswith(prefix)}
+        if not doomed:
+            return 0
+
+        self.requests["requests"] = [
+            r for r in self.requests["requests"]
+            if r.get("id") not in doomed
+        ]
+        for rid in doomed:
+            del self._by_id[rid]
+        self.schedule_save()
+        return len(doomed)
+
+    def clear_completed(self) -> int:
+        """
+        Remove all notified requests
+
+        Returns:
+            Number of requests removed
+        """
+        original_count = len(self.requests["requests"])
+        self.requests["requests"] = [
+            r for r in self.requests["requests"]
+            if not r.get("notified", False)
+        ]
         removed = original_count - len(self.requests["requests"])
         if removed > 0:
-            self._save_requests()
-            return True
-        return False
+            self._reindex()
+            self.schedule_save()
+        return removed
 
     def remove_old_requests(self, days: int = 30):
         """Remove requests older than specified days that have been notified"""
@@ -218,6 +372,7 @@ class RequestTracker:
 
         removed = original_count - len(self.requests["requests"])
         if removed > 0:
+            self._reindex()
             self._save_requests()
             logger.info("🧹 Removed %d old requests (older than %d days)", removed, days)
 
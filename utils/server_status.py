@@ -20,6 +20,9 @@ from utils.helpers import send_to_bot_topic
 
 logger = logging.getLogger(__name__)
 
+# Time of the most recent auto-wake trigger in this process (read by /debug)
+last_auto_wake = None
+
 async def check_server_status():
     """Check if the Plex server is actually running by testing the actual server IP"""
     try:
@@ -56,7 +59,9 @@ async def check_server_status():
 
 async def scheduled_wake(bot: Bot):
     """Scheduled wake function called by the scheduler"""
+    global last_auto_wake
     melbourne_time = datetime.now(MELBOURNE_TZ)
+    last_auto_wake = melbourne_time
     logger.info("⏰ Auto-wake job triggered at %s (Melbourne time)", melbourne_time.strftime('%Y-%m-%d %H:%M:%S %Z'))
     
     # Log system status